@@ -1,43 +1,93 @@
 """Configuration management for TOEIC Bot."""
 import os
-from pydantic import BaseModel
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+@lru_cache(maxsize=1)
+def _load_env() -> dict:
+    """Read all settings from the environment once and cache the snapshot."""
+    return {
+        # Telegram
+        'telegram_token': os.getenv("TELEGRAM_BOT_TOKEN_TOEIC", ""),
+
+        # Gemini AI
+        'gemini_api_key': os.getenv("GEMINI_API_KEY", ""),
+
+        # Scheduling
+        'daily_delivery_time': os.getenv("DAILY_DELIVERY_TIME", "07:00"),
+        'timezone': os.getenv("TIMEZONE", "Asia/Seoul"),
+
+        # Content settings
+        'listening_questions_per_day': int(os.getenv("LISTENING_QUESTIONS_PER_DAY", "3")),
+        'grammar_questions_per_day': int(os.getenv("GRAMMAR_QUESTIONS_PER_DAY", "5")),
+        'weekend_delivery': os.getenv("WEEKEND_DELIVERY", "false").lower() == "true",
+        'max_parallel_users': int(os.getenv("MAX_PARALLEL_USERS", "8")),
+
+        # Question pool (pre-generated questions per bucket)
+        'question_pool_depth': int(os.getenv("QUESTION_POOL_DEPTH", "20")),
+        'pool_prefetch_time': os.getenv("POOL_PREFETCH_TIME", "02:00"),
+
+        # Database
+        'database_url': os.getenv("DATABASE_URL", "sqlite:///toeic_bot.db"),
+
+        # TTS
+        'tts_language': os.getenv("TTS_LANGUAGE", "en"),
+        'tts_speed': float(os.getenv("TTS_SPEED", "1.0")),
+        'tts_bitrate': os.getenv("TTS_BITRATE", ""),
+        'tts_cache_max_mb': int(os.getenv("TTS_CACHE_MAX_MB", "500")),
+        'tts_concurrency': int(os.getenv("TTS_CONCURRENCY", "4")),
+    }
+
+
 class BotConfig(BaseModel):
-    """Bot configuration settings."""
-    
+    """Bot configuration settings.
+
+    Values are read once from the environment by ``_load_env``; the instance is
+    frozen so configuration cannot drift at runtime.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
     # Telegram
-    telegram_token: str = os.getenv("TELEGRAM_BOT_TOKEN_TOEIC", "")
-    
+    telegram_token: str
+
     # Gemini AI
-    gemini_api_key: str = os.getenv("GEMINI_API_KEY", "")
-    
+    gemini_api_key: str
+
     # Scheduling
-    daily_delivery_time: str = os.getenv("DAILY_DELIVERY_TIME", "07:00")
-    timezone: str = os.getenv("TIMEZONE", "Asia/Seoul")
-    
+    daily_delivery_time: str
+    timezone: str
+
     # Content settings
-    listening_questions_per_day: int = int(os.getenv("LISTENING_QUESTIONS_PER_DAY", "3"))
-    grammar_questions_per_day: int = int(os.getenv("GRAMMAR_QUESTIONS_PER_DAY", "5"))
-    weekend_delivery: bool = os.getenv("WEEKEND_DELIVERY", "false").lower() == "true"
-    
+    listening_questions_per_day: int
+    grammar_questions_per_day: int
+    weekend_delivery: bool
+    max_parallel_users: int
+
+    # Question pool
+    question_pool_depth: int
+    pool_prefetch_time: str  # nightly top-up sized for tomorrow's delivery
+
     # Database
-    database_url: str = os.getenv("DATABASE_URL", "sqlite:///toeic_bot.db")
-    
+    database_url: str
+
     # TTS (using gTTS - Google Text-to-Speech)
-    tts_language: str = os.getenv("TTS_LANGUAGE", "en")
-    tts_speed: float = float(os.getenv("TTS_SPEED", "1.0"))
-    
+    tts_language: str
+    tts_speed: float
+    tts_bitrate: str  # e.g. "32k"; empty keeps gTTS output as-is
+    tts_cache_max_mb: int
+    tts_concurrency: int
+
     # Target score
     default_target_score: int = 800
-    
-    class Config:
-        """Pydantic config."""
-        validate_assignment = True
 
 
 # Global config instance
-config = BotConfig()
+config = BotConfig(**_load_env())
+
+# Plain module-level value for hot paths
+TELEGRAM_TOKEN = config.telegram_token
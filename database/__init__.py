@@ -1,5 +1,5 @@
 """Database package initialization."""
-from .models import User, Question, Response, Progress, init_db, get_session
+from .models import User, Question, Response, Progress, QuestionPool, init_db, get_session, session_scope
 from .operations import DatabaseOperations
 
 __all__ = [
@@ -7,7 +7,9 @@ __all__ = [
     'Question', 
     'Response',
     'Progress',
+    'QuestionPool',
     'init_db',
     'get_session',
+    'session_scope',
     'DatabaseOperations'
 ]
@@ -1,38 +1,45 @@
 """Database models for TOEIC Bot."""
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Optional
-from sqlalchemy import create_engine, Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship, sessionmaker
+from functools import lru_cache
+from typing import Iterator, List, Optional
+from sqlalchemy import create_engine, event, inspect, text, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Index, UniqueConstraint
+from sqlalchemy.orm import DeclarativeBase, Mapped, Session, mapped_column, relationship, sessionmaker
 
-Base = declarative_base()
+
+class Base(DeclarativeBase):
+    """Declarative base for all models."""
 
 
 class User(Base):
     """User model for tracking learners."""
     
     __tablename__ = "users"
+    __table_args__ = (
+        Index("ix_users_active_delivery", "is_active", "last_delivery_at"),
+    )
     
-    id = Column(Integer, primary_key=True)
-    telegram_id = Column(Integer, unique=True, nullable=False, index=True)
-    username = Column(String(100), nullable=True)
-    first_name = Column(String(100), nullable=True)
-    target_score = Column(Integer, default=800)
-    current_estimated_score = Column(Integer, default=600)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    telegram_id: Mapped[int] = mapped_column(Integer, unique=True, nullable=False, index=True)
+    username: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    first_name: Mapped[Optional[str]] = mapped_column(String(100), nullable=True)
+    target_score: Mapped[Optional[int]] = mapped_column(Integer, default=800)
+    current_estimated_score: Mapped[Optional[int]] = mapped_column(Integer, default=600)
     
     # Preferences
-    delivery_time = Column(String(5), default="07:00")
-    timezone = Column(String(50), default="Asia/Seoul")
-    difficulty_level = Column(String(20), default="intermediate")  # beginner, intermediate, advanced
+    delivery_time: Mapped[Optional[str]] = mapped_column(String(5), default="07:00")
+    timezone: Mapped[Optional[str]] = mapped_column(String(50), default="Asia/Seoul")
+    difficulty_level: Mapped[Optional[str]] = mapped_column(String(20), default="intermediate")  # beginner, intermediate, advanced
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    last_active = Column(DateTime, default=datetime.utcnow)
-    is_active = Column(Boolean, default=True)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    last_active: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    is_active: Mapped[Optional[bool]] = mapped_column(Boolean, default=True)
+    last_delivery_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # Last daily lesson (UTC)
     
     # Relationships
-    responses = relationship("Response", back_populates="user", cascade="all, delete-orphan")
-    progress_records = relationship("Progress", back_populates="user", cascade="all, delete-orphan")
+    responses: Mapped[List["Response"]] = relationship(back_populates="user", cascade="all, delete-orphan")
+    progress_records: Mapped[List["Progress"]] = relationship(back_populates="user", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<User(telegram_id={self.telegram_id}, target={self.target_score})>"
@@ -43,31 +50,31 @@ class Question(Base):
     
     __tablename__ = "questions"
     
-    id = Column(Integer, primary_key=True)
-    question_type = Column(String(20), nullable=False)  # listening, grammar, vocabulary, reading
-    difficulty = Column(String(20), nullable=False)  # beginner, intermediate, advanced
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    question_type: Mapped[str] = mapped_column(String(20), nullable=False)  # listening, grammar, vocabulary, reading
+    difficulty: Mapped[str] = mapped_column(String(20), nullable=False)  # beginner, intermediate, advanced
     
     # Question content
-    question_text = Column(Text, nullable=False)
-    option_a = Column(String(500), nullable=False)
-    option_b = Column(String(500), nullable=False)
-    option_c = Column(String(500), nullable=False)
-    option_d = Column(String(500), nullable=False)
-    correct_answer = Column(String(1), nullable=False)  # A, B, C, or D
+    question_text: Mapped[str] = mapped_column(Text, nullable=False)
+    option_a: Mapped[str] = mapped_column(String(500), nullable=False)
+    option_b: Mapped[str] = mapped_column(String(500), nullable=False)
+    option_c: Mapped[str] = mapped_column(String(500), nullable=False)
+    option_d: Mapped[str] = mapped_column(String(500), nullable=False)
+    correct_answer: Mapped[str] = mapped_column(String(1), nullable=False)  # A, B, C, or D
     
     # Explanation
-    explanation = Column(Text, nullable=True)
+    explanation: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     
     # For listening questions
-    audio_script = Column(Text, nullable=True)
-    audio_file_path = Column(String(500), nullable=True)
+    audio_script: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
+    audio_file_path: Mapped[Optional[str]] = mapped_column(String(500), nullable=True)
     
     # Metadata
-    created_at = Column(DateTime, default=datetime.utcnow)
-    used_count = Column(Integer, default=0)
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    used_count: Mapped[Optional[int]] = mapped_column(Integer, default=0)
     
     # Relationships
-    responses = relationship("Response", back_populates="question")
+    responses: Mapped[List["Response"]] = relationship(back_populates="question")
     
     def __repr__(self):
         return f"<Question(type={self.question_type}, difficulty={self.difficulty})>"
@@ -77,22 +84,26 @@ class Response(Base):
     """User response model for tracking answers."""
     
     __tablename__ = "responses"
+    __table_args__ = (
+        Index("ix_responses_user_answered", "user_id", "answered_at"),
+    )
     
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    question_id: Mapped[int] = mapped_column(Integer, ForeignKey("questions.id"), nullable=False)
     
     # Response details
-    user_answer = Column(String(1), nullable=False)  # A, B, C, or D
-    is_correct = Column(Boolean, nullable=False)
-    time_taken_seconds = Column(Integer, nullable=True)
+    user_answer: Mapped[str] = mapped_column(String(1), nullable=False)  # A, B, C, or D
+    is_correct: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    time_taken_seconds: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     # Metadata
-    answered_at = Column(DateTime, default=datetime.utcnow)
+    answered_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
     
     # Relationships
-    user = relationship("User", back_populates="responses")
-    question = relationship("Question", back_populates="responses")
+    user: Mapped["User"] = relationship(back_populates="responses")
+    # Many-to-one, so eager-load alongside responses instead of one lazy SELECT each
+    question: Mapped["Question"] = relationship(back_populates="responses", lazy="selectin")
     
     def __repr__(self):
         return f"<Response(user_id={self.user_id}, correct={self.is_correct})>"
@@ -102,41 +113,168 @@ class Progress(Base):
     """Daily progress tracking."""
     
     __tablename__ = "progress"
+    __table_args__ = (
+        UniqueConstraint("user_id", "date", name="uq_progress_user_date"),
+    )
     
-    id = Column(Integer, primary_key=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
-    date = Column(DateTime, nullable=False, index=True)
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    date: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
     
     # Daily stats
-    questions_attempted = Column(Integer, default=0)
-    questions_correct = Column(Integer, default=0)
-    accuracy_percentage = Column(Float, default=0.0)
+    questions_attempted: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    questions_correct: Mapped[Optional[int]] = mapped_column(Integer, default=0)
+    accuracy_percentage: Mapped[Optional[float]] = mapped_column(Float, default=0.0)
     
     # By question type
-    listening_accuracy = Column(Float, nullable=True)
-    grammar_accuracy = Column(Float, nullable=True)
-    vocabulary_accuracy = Column(Float, nullable=True)
-    reading_accuracy = Column(Float, nullable=True)
+    listening_accuracy: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    grammar_accuracy: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    vocabulary_accuracy: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+    reading_accuracy: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     
     # Estimated score (based on performance)
-    estimated_toeic_score = Column(Integer, nullable=True)
+    estimated_toeic_score: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
     
     # Relationships
-    user = relationship("User", back_populates="progress_records")
+    user: Mapped["User"] = relationship(back_populates="progress_records")
     
     def __repr__(self):
         return f"<Progress(user_id={self.user_id}, date={self.date}, accuracy={self.accuracy_percentage:.1f}%)>"
 
 
+class QuestionPool(Base):
+    """Pre-generated question payloads waiting to be served."""
+    
+    __tablename__ = "question_pool"
+    __table_args__ = (
+        Index("ix_question_pool_bucket", "question_type", "difficulty", "topic", "consumed_at"),
+    )
+    
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    question_type: Mapped[str] = mapped_column(String(20), nullable=False)  # grammar, vocabulary, conversation, talk, reading
+    difficulty: Mapped[str] = mapped_column(String(20), nullable=False)
+    topic: Mapped[Optional[str]] = mapped_column(String(200), nullable=True)
+    
+    # Generator output, serialized as JSON
+    payload_json: Mapped[str] = mapped_column(Text, nullable=False)
+    
+    # Metadata
+    created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, default=datetime.utcnow)
+    consumed_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    
+    def __repr__(self):
+        return f"<QuestionPool(type={self.question_type}, difficulty={self.difficulty}, topic={self.topic})>"
+
+
+# Columns added after tables were first created; create_all does not alter
+# existing tables, so init_db adds these (and their indexes) in place
+_ADDED_COLUMNS = (
+    (User.__table__, 'last_delivery_at'),
+)
+
+
+def _add_missing_columns(engine):
+    """Add columns from _ADDED_COLUMNS that an older database lacks."""
+    inspector = inspect(engine)
+    for table, column_name in _ADDED_COLUMNS:
+        if column_name in {column['name'] for column in inspector.get_columns(table.name)}:
+            continue
+        
+        column_type = table.c[column_name].type.compile(dialect=engine.dialect)
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column_name} {column_type}"))
+        
+        for index in table.indexes:
+            if column_name in index.columns:
+                index.create(engine, checkfirst=True)
+
+
+# Unique constraints added to existing tables. Progress rows are recomputed
+# from responses on every answer, so duplicates can be dropped to build them
+_ADDED_UNIQUE_CONSTRAINTS = (
+    (Progress.__table__, 'uq_progress_user_date'),
+)
+
+
+def _add_missing_indexes(engine):
+    """Create indexes and unique constraints that an older database lacks."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
+    
+    inspector = inspect(engine)
+    for table, name in _ADDED_UNIQUE_CONSTRAINTS:
+        existing = {constraint['name'] for constraint in inspector.get_unique_constraints(table.name)}
+        existing.update(index['name'] for index in inspector.get_indexes(table.name) if index['unique'])
+        if name in existing:
+            continue
+        
+        constraint = next(c for c in table.constraints if c.name == name)
+        columns = ", ".join(column.name for column in constraint.columns)
+        with engine.begin() as conn:
+            # Keep the oldest row of each duplicate group
+            conn.execute(text(
+                f"DELETE FROM {table.name} WHERE id NOT IN "
+                f"(SELECT MIN(id) FROM {table.name} GROUP BY {columns})"
+            ))
+            conn.execute(text(f"CREATE UNIQUE INDEX {name} ON {table.name} ({columns})"))
+
+
 # Database initialization
+@lru_cache(maxsize=None)
 def init_db(database_url: str = "sqlite:///toeic_bot.db"):
-    """Initialize the database."""
-    engine = create_engine(database_url, echo=False)
+    """Initialize the database.
+    
+    Engines are cached per URL, so the bot, the scheduler and scripts in one
+    process share a single connection pool.
+    """
+    engine_options = {
+        'echo': False,
+        'query_cache_size': 1200,  # Compiled SQL cache shared across sessions
+        'pool_pre_ping': True,
+    }
+    if not database_url.startswith("sqlite"):
+        # Server databases get a pooled set of reusable connections
+        engine_options.update(pool_size=10, max_overflow=20)
+    
+    engine = create_engine(database_url, **engine_options)
+    
+    if database_url.startswith("sqlite"):
+        @event.listens_for(engine, "connect")
+        def _set_sqlite_pragma(dbapi_conn, _):
+            # WAL + NORMAL sync: commits no longer fsync the main file each time
+            cursor = dbapi_conn.cursor()
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.close()
+    
     Base.metadata.create_all(engine)
+    _add_missing_columns(engine)
+    _add_missing_indexes(engine)
     return engine
 
 
+@lru_cache(maxsize=None)
+def _session_factory(engine) -> sessionmaker:
+    """Build the session factory for an engine once."""
+    # Loaded values stay readable after commit instead of being reloaded
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
 def get_session(engine):
     """Get a database session."""
-    Session = sessionmaker(bind=engine)
-    return Session()
+    return _session_factory(engine)()
+
+
+@contextmanager
+def session_scope(engine) -> Iterator[Session]:
+    """Provide a session that commits on success, rolls back on error and is always closed."""
+    session = get_session(engine)
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
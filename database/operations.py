@@ -1,22 +1,55 @@
 """Database operations for TOEIC Bot."""
+import heapq
+from bisect import bisect_right
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.orm import Session
-from sqlalchemy import func, and_
+from sqlalchemy import func, and_, or_, case, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
 
 from .models import User, Question, Response, Progress
 
+# Score bands as (accuracy threshold, base score, points per accuracy point),
+# sorted by threshold for bisect lookups
+_SCORE_BANDS = (
+    (0, 400, 1.67),
+    (60, 500, 10),
+    (70, 600, 10),
+    (80, 700, 10),
+    (90, 800, 10),
+)
+_SCORE_THRESHOLDS = tuple(band[0] for band in _SCORE_BANDS)
+
+# Prebuilt Core INSERTs for the hot write paths; executing them skips the
+# ORM unit of work and reuses one cached compiled statement. The RETURNING
+# forms need SQLite 3.35+; older SQLite falls back to the plain INSERT and
+# the cursor's lastrowid.
+_INSERT_QUESTION_PLAIN = insert(Question)
+_INSERT_QUESTION = insert(Question).returning(Question.id)
+_INSERT_QUESTIONS = insert(Question).returning(Question.id, sort_by_parameter_order=True)
+_INSERT_RESPONSE = insert(Response)
+
 
 class DatabaseOperations:
     """CRUD operations for TOEIC Bot database."""
     
     def __init__(self, session: Session):
         self.session = session
+        self._user_cache: Dict[int, User] = {}
     
     # User operations
+    def _get_user(self, telegram_id: int) -> Optional[User]:
+        """Look up a user by Telegram ID, memoized for this session."""
+        user = self._user_cache.get(telegram_id)
+        if user is None:
+            user = self.session.query(User).filter_by(telegram_id=telegram_id).first()
+            if user:
+                self._user_cache[telegram_id] = user
+        return user
+    
     def get_or_create_user(self, telegram_id: int, username: str = None, first_name: str = None) -> User:
         """Get existing user or create new one."""
-        user = self.session.query(User).filter_by(telegram_id=telegram_id).first()
+        user = self._get_user(telegram_id)
         
         if not user:
             user = User(
@@ -26,6 +59,7 @@ class DatabaseOperations:
             )
             self.session.add(user)
             self.session.commit()
+            self._user_cache[telegram_id] = user
         else:
             # Update last active
             user.last_active = datetime.utcnow()
@@ -35,17 +69,45 @@ class DatabaseOperations:
     
     def update_user_preferences(self, telegram_id: int, **kwargs) -> User:
         """Update user preferences."""
-        user = self.session.query(User).filter_by(telegram_id=telegram_id).first()
+        user = self._get_user(telegram_id)
         if user:
             for key, value in kwargs.items():
                 if hasattr(user, key):
                     setattr(user, key, value)
             self.session.commit()
+            self._user_cache.pop(telegram_id, None)
         return user
     
-    def get_all_active_users(self) -> List[User]:
-        """Get all active users for daily delivery."""
-        return self.session.query(User).filter_by(is_active=True).all()
+    def get_all_active_users(self, not_delivered_since: Optional[datetime] = None) -> List[User]:
+        """Get all active users for daily delivery.
+        
+        Args:
+            not_delivered_since: If given, only return users whose last
+                delivery (UTC) is older than this, or who never had one
+        """
+        query = self.session.query(User).filter(User.is_active.is_(True))
+        if not_delivered_since is not None:
+            query = query.filter(or_(
+                User.last_delivery_at.is_(None),
+                User.last_delivery_at < not_delivered_since
+            ))
+        return query.all()
+    
+    def count_active_users_by_difficulty(self) -> Dict[str, int]:
+        """Count active users per difficulty level."""
+        rows = self.session.query(User.difficulty_level, func.count(User.id)).filter(
+            User.is_active.is_(True)
+        ).group_by(User.difficulty_level).all()
+        return dict(rows)
+    
+    def mark_delivered(self, telegram_id: int, delivered_at: Optional[datetime] = None):
+        """Record that a user's daily lesson was delivered."""
+        self.session.execute(
+            update(User).where(User.telegram_id == telegram_id).values(
+                last_delivery_at=delivered_at or datetime.utcnow()
+            )
+        )
+        self.session.commit()
     
     # Question operations
     def save_question(self, question_data: Dict[str, Any]) -> Question:
@@ -55,6 +117,43 @@ class DatabaseOperations:
         self.session.commit()
         return question
     
+    def insert_question(self, question_data: Dict[str, Any]) -> int:
+        """Save a generated question without loading it as an ORM object.
+        
+        Returns:
+            ID of the new question
+        """
+        if self._insert_returning:
+            question_id = self.session.execute(_INSERT_QUESTION, question_data).scalar_one()
+        else:
+            result = self.session.connection().execute(_INSERT_QUESTION_PLAIN, question_data)
+            question_id = result.inserted_primary_key[0]
+        self.session.commit()
+        return question_id
+    
+    def save_questions_bulk(self, rows: List[Dict[str, Any]]) -> List[int]:
+        """Save several generated questions with one executemany and one commit.
+        
+        Args:
+            rows: Question column dictionaries
+        
+        Returns:
+            IDs of the new questions, in the order of ``rows``
+        """
+        if not rows:
+            return []
+        
+        if self._insert_returning:
+            question_ids = list(self.session.execute(_INSERT_QUESTIONS, rows).scalars())
+        else:
+            # No RETURNING: one INSERT per row to read each new ID
+            question_ids = [
+                self.session.connection().execute(_INSERT_QUESTION_PLAIN, row).inserted_primary_key[0]
+                for row in rows
+            ]
+        self.session.commit()
+        return question_ids
+    
     def get_question_by_id(self, question_id: int) -> Optional[Question]:
         """Get question by ID."""
         return self.session.query(Question).filter_by(id=question_id).first()
@@ -63,6 +162,7 @@ class DatabaseOperations:
     def save_response(self, user_id: int, question_id: int, user_answer: str, 
                      time_taken: Optional[int] = None) -> Response:
         """Save user response and update progress."""
+        now = datetime.utcnow()
         question = self.get_question_by_id(question_id)
         is_correct = (user_answer.upper() == question.correct_answer.upper())
         
@@ -71,62 +171,134 @@ class DatabaseOperations:
             question_id=question_id,
             user_answer=user_answer.upper(),
             is_correct=is_correct,
-            time_taken_seconds=time_taken
+            time_taken_seconds=time_taken,
+            answered_at=now
         )
         self.session.add(response)
         
         # Update question usage
         question.used_count += 1
         
+        # Update daily progress, then commit everything in one transaction
+        self._update_daily_progress(
+            user_id, today=now.replace(hour=0, minute=0, second=0, microsecond=0)
+        )
         self.session.commit()
         
-        # Update daily progress
-        self._update_daily_progress(user_id)
-        
         return response
     
-    def _update_daily_progress(self, user_id: int):
-        """Update daily progress for a user."""
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    def record_answer(self, telegram_id: int, question_id: int,
+                      user_answer: str) -> Tuple[bool, str, Optional[str]]:
+        """Record an answer button press in a single transaction.
+        
+        Creates the user on first contact (refreshing last_active otherwise),
+        saves the response and updates daily progress.
+        
+        Args:
+            telegram_id: Telegram user ID
+            question_id: Answered question ID
+            user_answer: Chosen option letter
+        
+        Returns:
+            Tuple of (is_correct, correct_answer, explanation)
+        """
+        now = datetime.utcnow()
+        user_answer = user_answer.upper()
         
-        # Get or create today's progress record
+        # Upsert the user and get its ID in one statement where RETURNING is available
+        upsert = self._insert(User).values(telegram_id=telegram_id).on_conflict_do_update(
+            index_elements=[User.telegram_id], set_={'last_active': now}
+        )
+        if self._insert_returning:
+            user_id = self.session.execute(upsert.returning(User.id)).scalar_one()
+        else:
+            self.session.execute(upsert)
+            user_id = self.session.execute(
+                select(User.id).where(User.telegram_id == telegram_id)
+            ).scalar_one()
+        
+        correct_answer, explanation = self.session.execute(
+            select(Question.correct_answer, Question.explanation).where(Question.id == question_id)
+        ).one()
+        is_correct = (user_answer == correct_answer.upper())
+        
+        self.session.execute(_INSERT_RESPONSE, {
+            'user_id': user_id,
+            'question_id': question_id,
+            'user_answer': user_answer,
+            'is_correct': is_correct,
+            'answered_at': now
+        })
+        self.session.execute(
+            update(Question).where(Question.id == question_id).values(used_count=Question.used_count + 1)
+        )
+        
+        self._update_daily_progress(
+            user_id, today=now.replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+        self.session.commit()
+        
+        return is_correct, correct_answer, explanation
+    
+    def _update_daily_progress(self, user_id: int, today: Optional[datetime] = None):
+        """Update daily progress for a user.
+        
+        Changes are left pending; the caller commits them.
+        
+        Args:
+            user_id: Database user ID
+            today: Midnight (UTC) of the day to update; defaults to the current day
+        """
+        if today is None:
+            today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        
+        # Create today's progress record if missing, then fetch it
+        self.session.execute(
+            self._insert(Progress).values(user_id=user_id, date=today).on_conflict_do_nothing()
+        )
         progress = self.session.query(Progress).filter(
             and_(Progress.user_id == user_id, Progress.date == today)
-        ).first()
+        ).one()
         
-        if not progress:
-            progress = Progress(user_id=user_id, date=today)
-            self.session.add(progress)
-        
-        # Calculate today's stats
-        today_responses = self.session.query(Response).join(User).filter(
+        # Calculate today's stats, aggregated per question type in SQL
+        type_stats = self.session.query(
+            Question.question_type,
+            func.count(Response.id),
+            func.sum(case((Response.is_correct, 1), else_=0))
+        ).join(Question, Response.question_id == Question.id).filter(
             and_(
-                User.id == user_id,
+                Response.user_id == user_id,
                 Response.answered_at >= today
             )
-        ).all()
+        ).group_by(Question.question_type).all()
         
-        if today_responses:
-            progress.questions_attempted = len(today_responses)
-            progress.questions_correct = sum(1 for r in today_responses if r.is_correct)
+        if type_stats:
+            progress.questions_attempted = sum(count for _, count, _ in type_stats)
+            progress.questions_correct = sum(correct for _, _, correct in type_stats)
             progress.accuracy_percentage = (progress.questions_correct / progress.questions_attempted) * 100
             
-            # Calculate by type
-            for q_type in ['listening', 'grammar', 'vocabulary', 'reading']:
-                type_responses = [r for r in today_responses if r.question.question_type == q_type]
-                if type_responses:
-                    type_correct = sum(1 for r in type_responses if r.is_correct)
-                    type_accuracy = (type_correct / len(type_responses)) * 100
-                    setattr(progress, f"{q_type}_accuracy", type_accuracy)
+            # Accuracy by type
+            for q_type, count, correct in type_stats:
+                if q_type in ('listening', 'grammar', 'vocabulary', 'reading'):
+                    setattr(progress, f"{q_type}_accuracy", (correct / count) * 100)
             
             # Estimate TOEIC score (simplified formula)
             progress.estimated_toeic_score = self._estimate_toeic_score(progress.accuracy_percentage)
             
             # Update user's current estimated score
-            user = self.session.query(User).filter_by(id=user_id).first()
+            user = self.session.get(User, user_id)
             user.current_estimated_score = progress.estimated_toeic_score
-        
-        self.session.commit()
+    
+    @property
+    def _insert_returning(self) -> bool:
+        """Whether the database supports INSERT ... RETURNING."""
+        return self.session.get_bind().dialect.insert_returning
+    
+    def _insert(self, model):
+        """Build a dialect-specific INSERT that supports ON CONFLICT clauses."""
+        if self.session.get_bind().dialect.name == "postgresql":
+            return postgresql.insert(model)
+        return sqlite.insert(model)
     
     def _estimate_toeic_score(self, accuracy: float) -> int:
         """Estimate TOEIC score based on accuracy.
@@ -138,36 +310,35 @@ class DatabaseOperations:
         - 60-70% → 500-600
         - <60% → 400-500
         """
-        if accuracy >= 90:
-            return int(800 + (accuracy - 90) * 10)
-        elif accuracy >= 80:
-            return int(700 + (accuracy - 80) * 10)
-        elif accuracy >= 70:
-            return int(600 + (accuracy - 70) * 10)
-        elif accuracy >= 60:
-            return int(500 + (accuracy - 60) * 10)
-        else:
-            return int(400 + accuracy * 1.67)
+        threshold, base, slope = _SCORE_BANDS[max(bisect_right(_SCORE_THRESHOLDS, accuracy) - 1, 0)]
+        return int(base + (accuracy - threshold) * slope)
     
     # Progress operations
     def get_user_progress(self, telegram_id: int, days: int = 7) -> List[Progress]:
         """Get user progress for the last N days."""
-        user = self.session.query(User).filter_by(telegram_id=telegram_id).first()
+        user = self._get_user(telegram_id)
         if not user:
             return []
         
+        return self._recent_progress(user.id, days)
+    
+    def _recent_progress(self, user_id: int, days: int) -> List[Progress]:
+        """Get progress records for a database user ID, newest first."""
         start_date = datetime.utcnow() - timedelta(days=days)
         return self.session.query(Progress).filter(
             and_(
-                Progress.user_id == user.id,
+                Progress.user_id == user_id,
                 Progress.date >= start_date
             )
         ).order_by(Progress.date.desc()).all()
     
     def get_weak_areas(self, telegram_id: int, days: int = 7) -> Dict[str, float]:
-        """Identify weak areas based on recent performance."""
-        progress_records = self.get_user_progress(telegram_id, days)
-        
+        """Identify the three weakest areas based on recent performance."""
+        return self._weak_areas_from(self.get_user_progress(telegram_id, days))
+    
+    @staticmethod
+    def _weak_areas_from(progress_records: List[Progress]) -> Dict[str, float]:
+        """Average per-type accuracy over already-loaded progress records."""
         if not progress_records:
             return {}
         
@@ -183,36 +354,44 @@ class DatabaseOperations:
                 avg_accuracy = sum(accuracies) / len(accuracies)
                 weak_areas[q_type] = avg_accuracy
         
-        # Sort by accuracy (lowest first = weakest)
-        return dict(sorted(weak_areas.items(), key=lambda x: x[1]))
+        # Keep the three weakest areas (lowest accuracy first)
+        return dict(heapq.nsmallest(3, weak_areas.items(), key=lambda x: x[1]))
     
     def get_user_stats(self, telegram_id: int) -> Dict[str, Any]:
         """Get comprehensive user statistics."""
-        user = self.session.query(User).filter_by(telegram_id=telegram_id).first()
-        if not user:
+        # User fields and response totals in one aggregate query
+        row = self.session.execute(
+            select(
+                User.id,
+                User.current_estimated_score,
+                User.target_score,
+                func.count(Response.id),
+                func.sum(case((Response.is_correct, 1), else_=0))
+            ).outerjoin(Response, Response.user_id == User.id).where(
+                User.telegram_id == telegram_id
+            ).group_by(User.id)
+        ).first()
+        if not row:
             return {}
         
-        # Get all responses
-        total_responses = self.session.query(Response).filter_by(user_id=user.id).count()
-        correct_responses = self.session.query(Response).filter_by(
-            user_id=user.id, is_correct=True
-        ).count()
+        user_id, current_score, target_score, total_responses, correct_responses = row
+        correct_responses = correct_responses or 0
         
         overall_accuracy = (correct_responses / total_responses * 100) if total_responses > 0 else 0
         
-        # Get recent progress
-        recent_progress = self.get_user_progress(telegram_id, days=7)
-        weak_areas = self.get_weak_areas(telegram_id, days=7)
+        # Load recent progress once and derive weak areas from it
+        recent_progress = self._recent_progress(user_id, days=7)
+        weak_areas = self._weak_areas_from(recent_progress)
         
         # Calculate streak
-        streak = self._calculate_streak(user.id)
+        streak = self._calculate_streak(user_id)
         
         return {
             'total_questions': total_responses,
             'overall_accuracy': overall_accuracy,
-            'current_score': user.current_estimated_score,
-            'target_score': user.target_score,
-            'progress_to_goal': (user.current_estimated_score / user.target_score) * 100,
+            'current_score': current_score,
+            'target_score': target_score,
+            'progress_to_goal': (current_score / target_score) * 100,
             'weak_areas': weak_areas,
             'recent_progress': recent_progress,
             'streak_days': streak
@@ -223,17 +402,19 @@ class DatabaseOperations:
         today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
         streak = 0
         
-        for i in range(365):  # Check up to 1 year
-            check_date = today - timedelta(days=i)
-            has_activity = self.session.query(Progress).filter(
+        # Fetch every active day of the last year in a single query
+        active_dates = {
+            row[0] for row in self.session.query(Progress.date).filter(
                 and_(
                     Progress.user_id == user_id,
-                    Progress.date == check_date,
+                    Progress.date >= today - timedelta(days=365),
                     Progress.questions_attempted > 0
                 )
-            ).first()
-            
-            if has_activity:
+            ).all()
+        }
+        
+        for i in range(365):  # Check up to 1 year
+            if today - timedelta(days=i) in active_dates:
                 streak += 1
             else:
                 break
@@ -1,7 +1,103 @@
 """Telegram message formatting utilities."""
-from typing import Dict, Any, List
+from functools import lru_cache
+from typing import Dict, Any, List, Sequence
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
+_HELP_MESSAGE = """📚 **TOEIC Bot Commands**
+
+**Daily Practice:**
+Your daily lesson arrives automatically each morning with listening and grammar questions.
+
+**Commands:**
+/start - Start using the bot
+/stats - View your progress and statistics
+/settings - Adjust your preferences
+/help - Show this help message
+
+**How to Use:**
+1. Listen to audio questions (great for your commute!)
+2. Tap A/B/C/D to answer questions
+3. Review explanations to learn
+4. Track your progress toward 800!
+
+**Tips:**
+🎧 Save audio files to listen during your commute
+📊 Check /stats weekly to see improvement
+🔥 Build a daily streak for best results
+
+Good luck! 화이팅! 🚀"""
+
+# Message templates, filled with str.format_map so each render is one pass
+_OPTIONS_TEMPLATE = (
+    "A) {option_a}\n"
+    "B) {option_b}\n"
+    "C) {option_c}\n"
+    "D) {option_d}\n"
+)
+
+_LISTENING_TEMPLATE = (
+    "🎧 **LISTENING QUESTION**\n\n"
+    "_{instruction}_\n\n"
+    "**{question}**\n\n"
+) + _OPTIONS_TEMPLATE
+
+_CONVERSATION_INSTRUCTION = "Listen to the audio, then answer:"
+_TALK_INSTRUCTION = "Listen to the talk/announcement, then answer:"
+
+_GRAMMAR_TEMPLATE = (
+    "✍️ **{q_type} QUESTION #{question_num}**\n\n"
+    "{question_text}\n\n"
+) + _OPTIONS_TEMPLATE
+
+_CORRECT_TEMPLATE = "✅ **Correct!**\n\n💡 {explanation}"
+_INCORRECT_TEMPLATE = (
+    "❌ **Incorrect.** The correct answer is **{correct_answer}**.\n\n"
+    "💡 {explanation}"
+)
+
+_DAILY_INTRO_TEMPLATE = (
+    "🎧 **TOEIC Daily Practice**\n\n"
+    "🎯 Target: {target_score} | Current: {current_score}\n"
+    "Progress: {bar} {progress:.0f}%\n"
+    "{streak_line}"
+    "\n━━━━━━━━━━━━━━━━━━━━━\n\n"
+)
+
+_SETTINGS_TEMPLATE = (
+    "⚙️ **Your Settings**\n\n"
+    "🕐 **Delivery Time:** {delivery_time}\n"
+    "🌏 **Timezone:** {timezone}\n"
+    "📊 **Difficulty:** {difficulty}\n"
+    "🎯 **Target Score:** {target_score}\n\n"
+    "To change settings, contact support or modify .env file."
+)
+
+
+@lru_cache(maxsize=8192)
+def _answer_keyboard(question_id: int) -> InlineKeyboardMarkup:
+    """Build the A/B/C/D answer keyboard, cached per question ID.
+    
+    InlineKeyboardMarkup is immutable once built, so the same instance can be
+    reused for every send of a question.
+    """
+    keyboard = [
+        [
+            InlineKeyboardButton("A", callback_data=f"answer_{question_id}_A"),
+            InlineKeyboardButton("B", callback_data=f"answer_{question_id}_B"),
+            InlineKeyboardButton("C", callback_data=f"answer_{question_id}_C"),
+            InlineKeyboardButton("D", callback_data=f"answer_{question_id}_D"),
+        ]
+    ]
+    return InlineKeyboardMarkup(keyboard)
+
+
+def _numbered_answer_row(question_num: int, question_id: int) -> List[InlineKeyboardButton]:
+    """Build one question's answer buttons, labelled with its number (1A, 1B, ...)."""
+    return [
+        InlineKeyboardButton(f"{question_num}{letter}", callback_data=f"answer_{question_id}_{letter}")
+        for letter in "ABCD"
+    ]
+
 
 class TelegramFormatter:
     """Format content for Telegram display."""
@@ -17,21 +113,13 @@ class TelegramFormatter:
         Returns:
             Formatted message text
         """
-        msg = "🎧 **LISTENING QUESTION**\n\n"
-        
         # Add conversation context if available
         if 'conversation' in question_data:
-            msg += "_Listen to the audio, then answer:_\n\n"
+            instruction = _CONVERSATION_INSTRUCTION
         else:
-            msg += "_Listen to the talk/announcement, then answer:_\n\n"
-        
-        msg += f"**{question_data['question']}**\n\n"
-        msg += f"A) {question_data['option_a']}\n"
-        msg += f"B) {question_data['option_b']}\n"
-        msg += f"C) {question_data['option_c']}\n"
-        msg += f"D) {question_data['option_d']}\n"
+            instruction = _TALK_INSTRUCTION
         
-        return msg
+        return _LISTENING_TEMPLATE.format_map({**question_data, 'instruction': instruction})
     
     @staticmethod
     def format_grammar_question(question_data: Dict[str, Any], question_id: int,
@@ -48,14 +136,9 @@ class TelegramFormatter:
         """
         q_type = "GRAMMAR" if question_data.get('question_type') == 'grammar' else "VOCABULARY"
         
-        msg = f"✍️ **{q_type} QUESTION #{question_num}**\n\n"
-        msg += f"{question_data['question_text']}\n\n"
-        msg += f"A) {question_data['option_a']}\n"
-        msg += f"B) {question_data['option_b']}\n"
-        msg += f"C) {question_data['option_c']}\n"
-        msg += f"D) {question_data['option_d']}\n"
-        
-        return msg
+        return _GRAMMAR_TEMPLATE.format_map(
+            {**question_data, 'q_type': q_type, 'question_num': question_num}
+        )
     
     @staticmethod
     def create_answer_keyboard(question_id: int) -> InlineKeyboardMarkup:
@@ -67,15 +150,22 @@ class TelegramFormatter:
         Returns:
             InlineKeyboardMarkup with A/B/C/D buttons
         """
-        keyboard = [
-            [
-                InlineKeyboardButton("A", callback_data=f"answer_{question_id}_A"),
-                InlineKeyboardButton("B", callback_data=f"answer_{question_id}_B"),
-                InlineKeyboardButton("C", callback_data=f"answer_{question_id}_C"),
-                InlineKeyboardButton("D", callback_data=f"answer_{question_id}_D"),
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
+        return _answer_keyboard(question_id)
+    
+    @staticmethod
+    def create_multi_answer_keyboard(question_ids: Sequence[int]) -> InlineKeyboardMarkup:
+        """Create one inline keyboard answering several questions.
+        
+        Args:
+            question_ids: Database question IDs, in the order they were sent
+            
+        Returns:
+            InlineKeyboardMarkup with a numbered A/B/C/D row per question
+        """
+        return InlineKeyboardMarkup([
+            _numbered_answer_row(num, question_id)
+            for num, question_id in enumerate(question_ids, 1)
+        ])
     
     @staticmethod
     def format_answer_result(is_correct: bool, correct_answer: str, 
@@ -90,14 +180,8 @@ class TelegramFormatter:
         Returns:
             Formatted result message
         """
-        if is_correct:
-            msg = "✅ **Correct!**\n\n"
-        else:
-            msg = f"❌ **Incorrect.** The correct answer is **{correct_answer}**.\n\n"
-        
-        msg += f"💡 {explanation}"
-        
-        return msg
+        template = _CORRECT_TEMPLATE if is_correct else _INCORRECT_TEMPLATE
+        return template.format_map({'correct_answer': correct_answer, 'explanation': explanation})
     
     @staticmethod
     def format_daily_intro(user_stats: Dict[str, Any]) -> str:
@@ -117,17 +201,15 @@ class TelegramFormatter:
         # Progress bar
         filled = int(progress / 10)
         bar = "█" * filled + "░" * (10 - filled)
+        streak_line = f"🔥 {streak} day streak!\n" if streak > 0 else ""
         
-        msg = f"🎧 **TOEIC Daily Practice**\n\n"
-        msg += f"🎯 Target: {target_score} | Current: {current_score}\n"
-        msg += f"Progress: {bar} {progress:.0f}%\n"
-        
-        if streak > 0:
-            msg += f"🔥 {streak} day streak!\n"
-        
-        msg += f"\n━━━━━━━━━━━━━━━━━━━━━\n\n"
-        
-        return msg
+        return _DAILY_INTRO_TEMPLATE.format_map({
+            'target_score': target_score,
+            'current_score': current_score,
+            'bar': bar,
+            'progress': progress,
+            'streak_line': streak_line,
+        })
     
     @staticmethod
     def format_stats(stats: Dict[str, Any]) -> str:
@@ -139,62 +221,39 @@ class TelegramFormatter:
         Returns:
             Formatted stats message
         """
-        msg = "📊 **Your TOEIC Progress**\n\n"
-        
-        # Overall stats
-        msg += f"🎯 **Target Score:** {stats.get('target_score', 800)}\n"
-        msg += f"💯 **Current Score:** {stats.get('current_score', 600)}\n"
-        msg += f"📈 **Progress:** {stats.get('progress_to_goal', 0):.0f}%\n\n"
-        
-        # Performance
         total_q = stats.get('total_questions', 0)
         accuracy = stats.get('overall_accuracy', 0)
-        msg += f"📝 **Questions Answered:** {total_q}\n"
-        msg += f"✅ **Overall Accuracy:** {accuracy:.1f}%\n"
+        
+        parts = [
+            "📊 **Your TOEIC Progress**\n\n",
+            # Overall stats
+            f"🎯 **Target Score:** {stats.get('target_score', 800)}\n",
+            f"💯 **Current Score:** {stats.get('current_score', 600)}\n",
+            f"📈 **Progress:** {stats.get('progress_to_goal', 0):.0f}%\n\n",
+            # Performance
+            f"📝 **Questions Answered:** {total_q}\n",
+            f"✅ **Overall Accuracy:** {accuracy:.1f}%\n",
+        ]
         
         if stats.get('streak_days', 0) > 0:
-            msg += f"🔥 **Streak:** {stats['streak_days']} days\n"
+            parts.append(f"🔥 **Streak:** {stats['streak_days']} days\n")
         
         # Weak areas
         weak_areas = stats.get('weak_areas', {})
         if weak_areas:
-            msg += "\n**📉 Areas to Improve:**\n"
+            parts.append("\n**📉 Areas to Improve:**\n")
             for area, acc in list(weak_areas.items())[:3]:
                 emoji = "🎧" if area == "listening" else "✍️"
-                msg += f"{emoji} {area.title()}: {acc:.0f}%\n"
+                parts.append(f"{emoji} {area.title()}: {acc:.0f}%\n")
         
-        msg += f"\n💡 Keep practicing to reach your goal!"
+        parts.append("\n💡 Keep practicing to reach your goal!")
         
-        return msg
+        return "".join(parts)
     
     @staticmethod
     def format_help_message() -> str:
         """Format help message with available commands."""
-        msg = """📚 **TOEIC Bot Commands**
-
-**Daily Practice:**
-Your daily lesson arrives automatically each morning with listening and grammar questions.
-
-**Commands:**
-/start - Start using the bot
-/stats - View your progress and statistics
-/settings - Adjust your preferences
-/help - Show this help message
-
-**How to Use:**
-1. Listen to audio questions (great for your commute!)
-2. Tap A/B/C/D to answer questions
-3. Review explanations to learn
-4. Track your progress toward 800!
-
-**Tips:**
-🎧 Save audio files to listen during your commute
-📊 Check /stats weekly to see improvement
-🔥 Build a daily streak for best results
-
-Good luck! 화이팅! 🚀"""
-        
-        return msg
+        return _HELP_MESSAGE
     
     @staticmethod
     def format_settings_message(user_prefs: Dict[str, Any]) -> str:
@@ -206,11 +265,9 @@ Good luck! 화이팅! 🚀"""
         Returns:
             Formatted settings message
         """
-        msg = "⚙️ **Your Settings**\n\n"
-        msg += f"🕐 **Delivery Time:** {user_prefs.get('delivery_time', '07:00')}\n"
-        msg += f"🌏 **Timezone:** {user_prefs.get('timezone', 'Asia/Seoul')}\n"
-        msg += f"📊 **Difficulty:** {user_prefs.get('difficulty_level', 'intermediate').title()}\n"
-        msg += f"🎯 **Target Score:** {user_prefs.get('target_score', 800)}\n\n"
-        msg += "To change settings, contact support or modify .env file."
-        
-        return msg
+        return _SETTINGS_TEMPLATE.format_map({
+            'delivery_time': user_prefs.get('delivery_time', '07:00'),
+            'timezone': user_prefs.get('timezone', 'Asia/Seoul'),
+            'difficulty': user_prefs.get('difficulty_level', 'intermediate').title(),
+            'target_score': user_prefs.get('target_score', 800),
+        })
@@ -2,9 +2,12 @@
 from .listening import ListeningGenerator
 from .grammar import GrammarGenerator
 from .tts import TTSGenerator
+from .cache import QuestionCache, PoolRefillWorker
 
 __all__ = [
     'ListeningGenerator',
     'GrammarGenerator',
-    'TTSGenerator'
+    'TTSGenerator',
+    'QuestionCache',
+    'PoolRefillWorker'
 ]
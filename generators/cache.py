@@ -0,0 +1,229 @@
+"""Persistent pool of pre-generated questions."""
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import logging
+import threading
+
+import orjson
+from sqlalchemy import and_, func
+
+from database import QuestionPool, get_session
+
+logger = logging.getLogger(__name__)
+
+DIFFICULTY_LEVELS = ('beginner', 'intermediate', 'advanced')
+
+# Most questions requested from Gemini in a single batched prompt
+MAX_BATCH_SIZE = 10
+
+# (question_type, difficulty, topic, batch producer)
+Bucket = Tuple[str, str, Optional[str], Callable[[int], List[Dict[str, Any]]]]
+
+
+class QuestionCache:
+    """Serve generated questions from a DB-backed pool keyed by
+    (question_type, difficulty, topic).
+    
+    Each pooled question is handed out once; the pool is refilled in the
+    background so most requests never wait on Gemini.
+    """
+    
+    def __init__(self, engine):
+        """Initialize the cache.
+        
+        Args:
+            engine: SQLAlchemy engine holding the question_pool table
+        """
+        self.engine = engine
+    
+    @staticmethod
+    def _bucket(question_type: str, difficulty: str, topic: Optional[str]):
+        """Filter clause selecting one bucket's unconsumed entries."""
+        return and_(
+            QuestionPool.question_type == question_type,
+            QuestionPool.difficulty == difficulty,
+            QuestionPool.topic == topic,
+            QuestionPool.consumed_at.is_(None)
+        )
+    
+    def pop_unused(self, question_type: str, difficulty: str,
+                   topic: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Claim the oldest unused question in a bucket.
+        
+        Args:
+            question_type: Generator kind (grammar, vocabulary, conversation, talk, reading)
+            difficulty: Question difficulty
+            topic: Optional topic the question was generated for
+        
+        Returns:
+            Question dictionary, or None if the bucket is empty
+        """
+        session = get_session(self.engine)
+        try:
+            # Retry if a concurrent caller claims the same row first
+            for _ in range(3):
+                row = session.query(QuestionPool.id, QuestionPool.payload_json).filter(
+                    self._bucket(question_type, difficulty, topic)
+                ).order_by(QuestionPool.id).first()
+                if row is None:
+                    return None
+                
+                claimed = session.query(QuestionPool).filter(
+                    and_(QuestionPool.id == row.id, QuestionPool.consumed_at.is_(None))
+                ).update({QuestionPool.consumed_at: datetime.utcnow()}, synchronize_session=False)
+                session.commit()
+                
+                if claimed:
+                    return orjson.loads(row.payload_json)
+            return None
+        finally:
+            session.close()
+    
+    def peek_unused(self, question_type: str, difficulty: str,
+                    topic: Optional[str] = None, limit: int = MAX_BATCH_SIZE) -> List[Dict[str, Any]]:
+        """Return the oldest unused questions in a bucket without claiming them.
+        
+        Args:
+            question_type: Generator kind
+            difficulty: Question difficulty
+            topic: Optional topic the questions were generated for
+            limit: Maximum number of questions returned
+        
+        Returns:
+            Question dictionaries in the order pop_unused hands them out
+        """
+        session = get_session(self.engine)
+        try:
+            rows = session.query(QuestionPool.payload_json).filter(
+                self._bucket(question_type, difficulty, topic)
+            ).order_by(QuestionPool.id).limit(limit).all()
+            return [orjson.loads(row.payload_json) for row in rows]
+        finally:
+            session.close()
+    
+    def insert_many(self, question_type: str, difficulty: str, topic: Optional[str],
+                    payloads: List[Dict[str, Any]]):
+        """Add generated questions to a bucket in one transaction.
+        
+        Args:
+            question_type: Generator kind
+            difficulty: Question difficulty
+            topic: Optional topic the questions were generated for
+            payloads: Question dictionaries returned by a generator
+        """
+        if not payloads:
+            return
+        
+        session = get_session(self.engine)
+        try:
+            # Plain mappings go out as one executemany INSERT, skipping
+            # per-object unit-of-work bookkeeping
+            session.bulk_insert_mappings(QuestionPool, [
+                {
+                    'question_type': question_type,
+                    'difficulty': difficulty,
+                    'topic': topic,
+                    'payload_json': orjson.dumps(payload).decode()
+                }
+                for payload in payloads
+            ])
+            session.commit()
+        finally:
+            session.close()
+    
+    def count_unused(self, question_type: str, difficulty: str,
+                     topic: Optional[str] = None) -> int:
+        """Count unused questions in a bucket."""
+        session = get_session(self.engine)
+        try:
+            return session.query(func.count(QuestionPool.id)).filter(
+                self._bucket(question_type, difficulty, topic)
+            ).scalar()
+        finally:
+            session.close()
+    
+    def prewarm(self, question_type: str, difficulty: str, topic: Optional[str],
+                producer: Callable[[int], List[Dict[str, Any]]], depth: int,
+                batch_size: int = MAX_BATCH_SIZE) -> int:
+        """Top a bucket up to the target depth.
+        
+        Args:
+            question_type: Generator kind
+            difficulty: Question difficulty
+            topic: Optional topic
+            producer: Callable taking a count and generating up to that many
+                questions in one request, without consulting the cache
+            depth: Target number of unused questions
+            batch_size: Maximum number of questions requested per call
+        
+        Returns:
+            Number of questions added
+        """
+        missing = depth - self.count_unused(question_type, difficulty, topic)
+        added = 0
+        
+        while added < missing:
+            try:
+                payloads = producer(min(batch_size, missing - added))
+            except Exception as e:
+                logger.error(f"Error prewarming {question_type}/{difficulty} pool: {e}")
+                break
+            
+            if not payloads:
+                break
+            
+            self.insert_many(question_type, difficulty, topic, payloads)
+            added += len(payloads)
+        
+        return added
+
+
+class PoolRefillWorker:
+    """Keep question pool buckets topped up with batched Gemini requests.
+    
+    ``bucket_source`` is called on every run and yields
+    ``(question_type, difficulty, topic, producer)`` tuples, so buckets that
+    depend on the date (such as today's grammar topic) stay current.
+    """
+    
+    def __init__(self, cache: QuestionCache,
+                 bucket_source: Callable[[], Iterable[Bucket]], depth: int):
+        """Initialize the worker.
+        
+        Args:
+            cache: Question pool to refill
+            bucket_source: Callable yielding the buckets to keep filled
+            depth: Target number of unused questions per bucket
+        """
+        self.cache = cache
+        self.bucket_source = bucket_source
+        self.depth = depth
+        self._lock = threading.Lock()
+    
+    def run_once(self, depths: Optional[Dict[Tuple[str, str, Optional[str]], int]] = None,
+                 wait: bool = False) -> int:
+        """Refill every bucket once.
+        
+        Args:
+            depths: Optional target depth per (question_type, difficulty, topic)
+                bucket, overriding the worker's depth for those buckets
+            wait: Wait for a refill already running to finish instead of
+                skipping this run
+        
+        Returns:
+            Number of questions added
+        """
+        if not self._lock.acquire(blocking=wait):
+            logger.info("Question pool refill already running, skipping")
+            return 0
+        
+        try:
+            added = 0
+            for question_type, difficulty, topic, producer in self.bucket_source():
+                depth = (depths or {}).get((question_type, difficulty, topic), self.depth)
+                added += self.cache.prewarm(question_type, difficulty, topic, producer, depth)
+            
+            logger.info(f"Question pool refill added {added} questions")
+            return added
+        finally:
+            self._lock.release()
@@ -0,0 +1,127 @@
+"""Shared Gemini client setup for the question generators."""
+from functools import lru_cache
+from typing import Any, Dict, List
+import google.generativeai as genai
+from google.api_core import retry, retry_async
+import orjson
+
+from config import config
+
+MODEL_NAME = 'gemini-3-flash-preview'
+
+# Prepended to every question prompt template
+SYSTEM_PREAMBLE = "You are a TOEIC test question generator. Always return valid JSON.\n\n"
+
+_BATCH_INSTRUCTIONS = """
+
+Generate {n} different questions following the instructions above. Vary the scenario and the correct answer letter between questions.
+Return ONLY a valid JSON array of {n} objects, each in the exact format shown above."""
+
+# Per-call deadline plus exponential backoff on transient errors (429/5xx),
+# so slow or throttled requests fail fast and are retried instead of hanging
+REQUEST_TIMEOUT_SECONDS = 30
+_RETRY_SETTINGS = dict(initial=1.0, maximum=10.0, multiplier=2.0, timeout=90.0)
+REQUEST_OPTIONS = {
+    'timeout': REQUEST_TIMEOUT_SECONDS,
+    'retry': retry.Retry(**_RETRY_SETTINGS),
+}
+ASYNC_REQUEST_OPTIONS = {
+    'timeout': REQUEST_TIMEOUT_SECONDS,
+    'retry': retry_async.AsyncRetry(**_RETRY_SETTINGS),
+}
+
+
+@lru_cache(maxsize=None)
+def get_model(model_name: str = MODEL_NAME) -> genai.GenerativeModel:
+    """Return a process-wide GenerativeModel, configuring the SDK on first use.
+    
+    All generators share this model, and with it one client whose connection
+    stays open across calls.
+    
+    Args:
+        model_name: Gemini model identifier
+    
+    Returns:
+        Cached GenerativeModel instance
+    """
+    genai.configure(api_key=config.gemini_api_key)
+    return genai.GenerativeModel(model_name)
+
+
+def json_config(schema: Any) -> genai.GenerationConfig:
+    """Build the generation settings for a structured JSON reply.
+    
+    Args:
+        schema: TypedDict (or list of one) describing the expected reply
+    
+    Returns:
+        GenerationConfig requesting JSON that matches the schema
+    """
+    return genai.GenerationConfig(
+        temperature=0.8,
+        response_mime_type="application/json",
+        response_schema=schema
+    )
+
+
+def decode_json(response) -> Any:
+    """Return a reply's structured value, decoding the text only if needed."""
+    parsed = getattr(response, 'parsed', None)
+    if parsed is not None:
+        return parsed
+    return orjson.loads(response.text)
+
+
+def batch_prompt(prompt: str, n: int) -> str:
+    """Extend a single-question prompt to ask for n questions in one reply.
+    
+    Args:
+        prompt: Prompt describing one question and its JSON format
+        n: Number of questions to request
+    
+    Returns:
+        Prompt requesting a JSON array of n questions
+    """
+    return prompt + _BATCH_INSTRUCTIONS.format(n=n)
+
+
+def generate_json(model: genai.GenerativeModel, prompt: str,
+                  generation_config: genai.GenerationConfig) -> Any:
+    """Stream a JSON reply and decode it as soon as it is complete.
+    
+    Chunks are collected in a list and joined once per decode attempt, and a
+    decode is only attempted when a chunk ends in a closing bracket, keeping
+    the work linear in the size of the reply.
+    
+    Args:
+        model: Model to query
+        prompt: Prompt text
+        generation_config: Generation settings (should request JSON output)
+    
+    Returns:
+        Decoded JSON value
+    """
+    chunks: List[str] = []
+    for chunk in model.generate_content(prompt, generation_config=generation_config, stream=True,
+                                        request_options=REQUEST_OPTIONS):
+        try:
+            text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. a bare finish reason)
+            continue
+        
+        chunks.append(text)
+        if text.rstrip().endswith(('}', ']')):
+            try:
+                return orjson.loads("".join(chunks))
+            except orjson.JSONDecodeError:
+                continue
+    
+    return orjson.loads("".join(chunks))
+
+
+def parse_batch(result: Any) -> List[Dict[str, Any]]:
+    """Normalize a decoded batched reply, tolerating a bare object for n=1."""
+    if isinstance(result, dict):
+        return [result]
+    return result
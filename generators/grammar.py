@@ -1,40 +1,32 @@
 """Generate TOEIC-style grammar questions."""
-from typing import Dict, Any
-import google.generativeai as genai
-import json
+from typing import Dict, Any, List, Optional, Union
+import asyncio
+import random
 
-from config import config
+from .cache import QuestionCache
+from .gemini import (
+    ASYNC_REQUEST_OPTIONS, REQUEST_OPTIONS, SYSTEM_PREAMBLE,
+    batch_prompt, decode_json, get_model, json_config, parse_batch
+)
+from .schemas import GrammarQuestion, VocabularyQuestion
 
+_FOCUSES = ('grammar', 'vocabulary')
 
-class GrammarGenerator:
-    """Generate TOEIC Part 5-6 grammar and vocabulary questions."""
-    
-    def __init__(self):
-        genai.configure(api_key=config.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-3-flash-preview')
-    
-    def generate_grammar_question(self, difficulty: str = "intermediate", 
-                                  grammar_point: str = None) -> Dict[str, Any]:
-        """Generate a TOEIC Part 5 style grammar question.
-        
-        Args:
-            difficulty: Question difficulty (beginner, intermediate, advanced)
-            grammar_point: Optional specific grammar point to focus on
-            
-        Returns:
-            Dictionary with question, options, answer, and explanation
-        """
-        difficulty_prompts = {
-            "beginner": "basic grammar concepts (simple tenses, articles, prepositions)",
-            "intermediate": "intermediate grammar (conditionals, perfect tenses, modals, relative clauses)",
-            "advanced": "advanced grammar (subjunctive, complex conditionals, nuanced usage)"
-        }
-        
-        grammar_focus = f"\nFocus on: {grammar_point}" if grammar_point else ""
-        
-        prompt = f"""Generate a TOEIC Part 5 style grammar question.
+_GRAMMAR_DIFFICULTY_HINTS = {
+    "beginner": "basic grammar concepts (simple tenses, articles, prepositions)",
+    "intermediate": "intermediate grammar (conditionals, perfect tenses, modals, relative clauses)",
+    "advanced": "advanced grammar (subjunctive, complex conditionals, nuanced usage)"
+}
+
+_VOCABULARY_DIFFICULTY_HINTS = {
+    "beginner": "common business vocabulary",
+    "intermediate": "intermediate business and professional vocabulary",
+    "advanced": "advanced vocabulary, collocations, and idiomatic expressions"
+}
 
-Difficulty level: {difficulty} - {difficulty_prompts.get(difficulty, difficulty_prompts['intermediate'])}{grammar_focus}
+_GRAMMAR_PROMPT_TEMPLATE = SYSTEM_PREAMBLE + """Generate a TOEIC Part 5 style grammar question.
+
+Difficulty level: {difficulty} - {difficulty_hint}{grammar_focus}
 
 Create a sentence with ONE blank, testing grammar or vocabulary in a business/workplace context.
 
@@ -64,41 +56,10 @@ Return ONLY valid JSON in this exact format:
   "explanation": "Future tense is needed for 'next quarter'. 'Will launch' is correct.",
   "grammar_point": "Future tense"
 }}"""
-        
-        response = self.model.generate_content(
-            f"""You are a TOEIC test question generator. Always return valid JSON.
 
-{prompt}""",
-            generation_config=genai.GenerationConfig(
-                temperature=0.8,
-                response_mime_type="application/json"
-            )
-        )
-        
-        result = json.loads(response.text)
-        result['question_type'] = 'grammar'
-        result['difficulty'] = difficulty
-        
-        return result
-    
-    def generate_vocabulary_question(self, difficulty: str = "intermediate") -> Dict[str, Any]:
-        """Generate a TOEIC vocabulary-in-context question.
-        
-        Args:
-            difficulty: Question difficulty
-            
-        Returns:
-            Dictionary with question, options, answer, and explanation
-        """
-        difficulty_prompts = {
-            "beginner": "common business vocabulary",
-            "intermediate": "intermediate business and professional vocabulary",
-            "advanced": "advanced vocabulary, collocations, and idiomatic expressions"
-        }
-        
-        prompt = f"""Generate a TOEIC Part 5 style vocabulary question.
+_VOCABULARY_PROMPT_TEMPLATE = SYSTEM_PREAMBLE + """Generate a TOEIC Part 5 style vocabulary question.
 
-Difficulty level: {difficulty} - {difficulty_prompts.get(difficulty, difficulty_prompts['intermediate'])}
+Difficulty level: {difficulty} - {difficulty_hint}
 
 Create a sentence with ONE blank, testing vocabulary in a business/workplace context.
 
@@ -125,22 +86,140 @@ Return ONLY valid JSON in this exact format:
   "explanation": "'Postpone' means to reschedule for later, which fits the context of a scheduling conflict.",
   "vocabulary_word": "postpone"
 }}"""
+
+
+class GrammarGenerator:
+    """Generate TOEIC Part 5-6 grammar and vocabulary questions."""
+    
+    # Shared by every request; GenerationConfig is not mutated per call
+    _CONFIGS = {
+        'grammar': json_config(GrammarQuestion),
+        'vocabulary': json_config(VocabularyQuestion),
+    }
+    _BATCH_CONFIGS = {
+        'grammar': json_config(list[GrammarQuestion]),
+        'vocabulary': json_config(list[VocabularyQuestion]),
+    }
+    
+    def __init__(self, cache: Optional[QuestionCache] = None):
+        """Initialize the generator.
+        
+        Args:
+            cache: Optional question pool consulted before calling Gemini
+        """
+        self.model = get_model()
+        self.cache = cache
+    
+    @staticmethod
+    def _grammar_prompt(difficulty: str, grammar_point: str = None) -> str:
+        """Fill the grammar prompt template."""
+        grammar_focus = f"\nFocus on: {grammar_point}" if grammar_point else ""
+        return _GRAMMAR_PROMPT_TEMPLATE.format(
+            difficulty=difficulty,
+            difficulty_hint=_GRAMMAR_DIFFICULTY_HINTS.get(difficulty, _GRAMMAR_DIFFICULTY_HINTS['intermediate']),
+            grammar_focus=grammar_focus
+        )
+    
+    @staticmethod
+    def _vocabulary_prompt(difficulty: str) -> str:
+        """Fill the vocabulary prompt template."""
+        return _VOCABULARY_PROMPT_TEMPLATE.format(
+            difficulty=difficulty,
+            difficulty_hint=_VOCABULARY_DIFFICULTY_HINTS.get(difficulty, _VOCABULARY_DIFFICULTY_HINTS['intermediate'])
+        )
+    
+    @staticmethod
+    def _tag(result: Dict[str, Any], question_type: str, difficulty: str) -> Dict[str, Any]:
+        """Tag a decoded question with its type and difficulty."""
+        result['question_type'] = question_type
+        result['difficulty'] = difficulty
+        return result
+    
+    @classmethod
+    def _parse_response(cls, response, question_type: str, difficulty: str) -> Dict[str, Any]:
+        """Decode the model's JSON reply and tag it with type and difficulty."""
+        return cls._tag(decode_json(response), question_type, difficulty)
+    
+    def generate_grammar_question(self, difficulty: str = "intermediate", 
+                                  grammar_point: str = None,
+                                  use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a TOEIC Part 5 style grammar question.
+        
+        Args:
+            difficulty: Question difficulty (beginner, intermediate, advanced)
+            grammar_point: Optional specific grammar point to focus on
+            use_cache: Serve from the question pool when one is available
+            
+        Returns:
+            Dictionary with question, options, answer, and explanation
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.pop_unused('grammar', difficulty, grammar_point)
+            if cached is not None:
+                return cached
         
         response = self.model.generate_content(
-            f"""You are a TOEIC test question generator. Always return valid JSON.
-
-{prompt}""",
-            generation_config=genai.GenerationConfig(
-                temperature=0.8,
-                response_mime_type="application/json"
-            )
+            self._grammar_prompt(difficulty, grammar_point),
+            generation_config=self._CONFIGS['grammar'],
+            request_options=REQUEST_OPTIONS
         )
+        return self._parse_response(response, 'grammar', difficulty)
+    
+    async def generate_grammar_question_async(self, difficulty: str = "intermediate",
+                                              grammar_point: str = None,
+                                              use_cache: bool = True) -> Dict[str, Any]:
+        """Async variant of generate_grammar_question."""
+        if use_cache and self.cache is not None:
+            # The pool claim is a blocking SELECT + UPDATE; keep it off the loop
+            cached = await asyncio.to_thread(self.cache.pop_unused, 'grammar', difficulty, grammar_point)
+            if cached is not None:
+                return cached
         
-        result = json.loads(response.text)
-        result['question_type'] = 'vocabulary'
-        result['difficulty'] = difficulty
+        response = await self.model.generate_content_async(
+            self._grammar_prompt(difficulty, grammar_point),
+            generation_config=self._CONFIGS['grammar'],
+            request_options=ASYNC_REQUEST_OPTIONS
+        )
+        return self._parse_response(response, 'grammar', difficulty)
+    
+    def generate_vocabulary_question(self, difficulty: str = "intermediate",
+                                     use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a TOEIC vocabulary-in-context question.
         
-        return result
+        Args:
+            difficulty: Question difficulty
+            use_cache: Serve from the question pool when one is available
+            
+        Returns:
+            Dictionary with question, options, answer, and explanation
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.pop_unused('vocabulary', difficulty, None)
+            if cached is not None:
+                return cached
+        
+        response = self.model.generate_content(
+            self._vocabulary_prompt(difficulty),
+            generation_config=self._CONFIGS['vocabulary'],
+            request_options=REQUEST_OPTIONS
+        )
+        return self._parse_response(response, 'vocabulary', difficulty)
+    
+    async def generate_vocabulary_question_async(self, difficulty: str = "intermediate",
+                                                 use_cache: bool = True) -> Dict[str, Any]:
+        """Async variant of generate_vocabulary_question."""
+        if use_cache and self.cache is not None:
+            # The pool claim is a blocking SELECT + UPDATE; keep it off the loop
+            cached = await asyncio.to_thread(self.cache.pop_unused, 'vocabulary', difficulty, None)
+            if cached is not None:
+                return cached
+        
+        response = await self.model.generate_content_async(
+            self._vocabulary_prompt(difficulty),
+            generation_config=self._CONFIGS['vocabulary'],
+            request_options=ASYNC_REQUEST_OPTIONS
+        )
+        return self._parse_response(response, 'vocabulary', difficulty)
     
     def generate_question(self, difficulty: str = "intermediate",
                          focus: str = None) -> Dict[str, Any]:
@@ -153,12 +232,64 @@ Return ONLY valid JSON in this exact format:
         Returns:
             Question dictionary
         """
-        import random
-        
         if focus is None:
-            focus = random.choice(['grammar', 'vocabulary'])
+            focus = random.choice(_FOCUSES)
         
         if focus == 'grammar':
             return self.generate_grammar_question(difficulty)
         else:
             return self.generate_vocabulary_question(difficulty)
+
+    async def generate_question_async(self, difficulty: str = "intermediate",
+                                      focus: str = None) -> Dict[str, Any]:
+        """Async variant of generate_question."""
+        if focus is None:
+            focus = random.choice(_FOCUSES)
+        
+        if focus == 'grammar':
+            return await self.generate_grammar_question_async(difficulty)
+        else:
+            return await self.generate_vocabulary_question_async(difficulty)
+    
+    async def generate_many(self, n: int, difficulty: str = "intermediate") -> List[Union[Dict[str, Any], Exception]]:
+        """Generate n questions concurrently.
+        
+        Args:
+            n: Number of questions to generate
+            difficulty: Question difficulty
+            
+        Returns:
+            List of question dictionaries; a failed request yields its
+            exception in place of the dictionary
+        """
+        return await asyncio.gather(
+            *(self.generate_question_async(difficulty) for _ in range(n)),
+            return_exceptions=True
+        )
+    
+    def generate_batch(self, difficulty: str, n: int, focus: str = 'grammar',
+                       grammar_point: str = None) -> List[Dict[str, Any]]:
+        """Generate n questions with a single Gemini request.
+        
+        Used to refill the question pool; never consults the cache.
+        
+        Args:
+            difficulty: Question difficulty
+            n: Number of questions to generate
+            focus: 'grammar' or 'vocabulary'
+            grammar_point: Optional grammar point (grammar focus only)
+            
+        Returns:
+            List of question dictionaries (may be shorter than n)
+        """
+        if focus == 'grammar':
+            prompt = self._grammar_prompt(difficulty, grammar_point)
+        else:
+            prompt = self._vocabulary_prompt(difficulty)
+        
+        response = self.model.generate_content(
+            batch_prompt(prompt, n),
+            generation_config=self._BATCH_CONFIGS[focus],
+            request_options=REQUEST_OPTIONS
+        )
+        return [self._tag(result, focus, difficulty) for result in parse_batch(decode_json(response))[:n]]
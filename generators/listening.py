@@ -1,36 +1,24 @@
 """Generate TOEIC-style listening questions."""
-from typing import Dict, Any, Optional
-import google.generativeai as genai
-import json
+from typing import Dict, Any, List, Optional
 
-from config import config
+from .cache import QuestionCache
+from .gemini import SYSTEM_PREAMBLE, batch_prompt, generate_json, get_model, json_config, parse_batch
+from .schemas import ConversationQuestion, TalkQuestion
 
+_CONVERSATION_CONFIG = json_config(ConversationQuestion)
+_CONVERSATION_BATCH_CONFIG = json_config(list[ConversationQuestion])
+_TALK_CONFIG = json_config(TalkQuestion)
+_TALK_BATCH_CONFIG = json_config(list[TalkQuestion])
 
-class ListeningGenerator:
-    """Generate TOEIC Part 3-4 listening questions."""
-    
-    def __init__(self):
-        genai.configure(api_key=config.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-3-flash-preview')
-    
-    def generate_conversation_question(self, difficulty: str = "intermediate") -> Dict[str, Any]:
-        """Generate a TOEIC Part 3 style conversation question.
-        
-        Args:
-            difficulty: Question difficulty (beginner, intermediate, advanced)
-            
-        Returns:
-            Dictionary with conversation script, question, options, and answer
-        """
-        difficulty_prompts = {
-            "beginner": "simple, everyday workplace situations with clear context",
-            "intermediate": "realistic workplace scenarios with moderate complexity",
-            "advanced": "complex business situations with nuanced language and idiomatic expressions"
-        }
-        
-        prompt = f"""Generate a TOEIC Part 3 style listening question.
+_CONVERSATION_DIFFICULTY_HINTS = {
+    "beginner": "simple, everyday workplace situations with clear context",
+    "intermediate": "realistic workplace scenarios with moderate complexity",
+    "advanced": "complex business situations with nuanced language and idiomatic expressions"
+}
+
+_CONVERSATION_PROMPT_TEMPLATE = SYSTEM_PREAMBLE + """Generate a TOEIC Part 3 style listening question.
 
-Difficulty level: {difficulty} - {difficulty_prompts.get(difficulty, difficulty_prompts['intermediate'])}
+Difficulty level: {difficulty} - {difficulty_hint}
 
 Create a short conversation (2-3 exchanges) between two people in a workplace or business setting, followed by ONE comprehension question with 4 multiple choice options.
 
@@ -54,48 +42,16 @@ Return ONLY valid JSON in this exact format:
   "correct_answer": "A",
   "explanation": "Brief explanation of why this is correct"
 }}"""
-        
-        response = self.model.generate_content(
-            f"""You are a TOEIC test question generator. Always return valid JSON.
 
-{prompt}""",
-            generation_config=genai.GenerationConfig(
-                temperature=0.8,
-                response_mime_type="application/json"
-            )
-        )
-        
-        result = json.loads(response.text)
-        
-        # Format conversation as script for TTS
-        script_parts = []
-        for exchange in result['conversation']:
-            script_parts.append(exchange['text'])
-        
-        result['audio_script'] = " ... ".join(script_parts)
-        result['question_type'] = 'listening'
-        result['difficulty'] = difficulty
-        
-        return result
-    
-    def generate_talk_question(self, difficulty: str = "intermediate") -> Dict[str, Any]:
-        """Generate a TOEIC Part 4 style talk/announcement question.
-        
-        Args:
-            difficulty: Question difficulty
-            
-        Returns:
-            Dictionary with talk script, question, options, and answer
-        """
-        difficulty_prompts = {
-            "beginner": "simple announcements with clear, straightforward information",
-            "intermediate": "realistic announcements or talks with moderate detail",
-            "advanced": "complex talks with multiple details and sophisticated vocabulary"
-        }
-        
-        prompt = f"""Generate a TOEIC Part 4 style listening question.
+_TALK_DIFFICULTY_HINTS = {
+    "beginner": "simple announcements with clear, straightforward information",
+    "intermediate": "realistic announcements or talks with moderate detail",
+    "advanced": "complex talks with multiple details and sophisticated vocabulary"
+}
 
-Difficulty level: {difficulty} - {difficulty_prompts.get(difficulty, difficulty_prompts['intermediate'])}
+_TALK_PROMPT_TEMPLATE = SYSTEM_PREAMBLE + """Generate a TOEIC Part 4 style listening question.
+
+Difficulty level: {difficulty} - {difficulty_hint}
 
 Create a short talk, announcement, or voice message (3-5 sentences) followed by ONE comprehension question with 4 multiple choice options.
 
@@ -123,24 +79,103 @@ Return ONLY valid JSON in this exact format:
   "correct_answer": "B",
   "explanation": "Brief explanation of why this is correct"
 }}"""
-        
-        response = self.model.generate_content(
-            f"""You are a TOEIC test question generator. Always return valid JSON.
 
-{prompt}""",
-            generation_config=genai.GenerationConfig(
-                temperature=0.8,
-                response_mime_type="application/json"
-            )
+
+class ListeningGenerator:
+    """Generate TOEIC Part 3-4 listening questions."""
+    
+    def __init__(self, cache: Optional[QuestionCache] = None):
+        """Initialize the generator.
+        
+        Args:
+            cache: Optional question pool consulted before calling Gemini
+        """
+        self.model = get_model()
+        self.cache = cache
+    
+    @staticmethod
+    def _conversation_prompt(difficulty: str) -> str:
+        """Fill the Part 3 conversation prompt template."""
+        return _CONVERSATION_PROMPT_TEMPLATE.format(
+            difficulty=difficulty,
+            difficulty_hint=_CONVERSATION_DIFFICULTY_HINTS.get(difficulty, _CONVERSATION_DIFFICULTY_HINTS['intermediate'])
         )
+    
+    @staticmethod
+    def _finish_conversation(result: Dict[str, Any], difficulty: str) -> Dict[str, Any]:
+        """Attach the TTS script and tags to a decoded conversation question."""
+        # Format conversation as script for TTS
+        result['audio_script'] = " ... ".join(exchange['text'] for exchange in result['conversation'])
+        result['question_type'] = 'listening'
+        result['difficulty'] = difficulty
         
-        result = json.loads(response.text)
+        return result
+    
+    @staticmethod
+    def _talk_prompt(difficulty: str) -> str:
+        """Fill the Part 4 talk prompt template."""
+        return _TALK_PROMPT_TEMPLATE.format(
+            difficulty=difficulty,
+            difficulty_hint=_TALK_DIFFICULTY_HINTS.get(difficulty, _TALK_DIFFICULTY_HINTS['intermediate'])
+        )
+    
+    @staticmethod
+    def _finish_talk(result: Dict[str, Any], difficulty: str) -> Dict[str, Any]:
+        """Attach the TTS script and tags to a decoded talk question."""
         result['audio_script'] = result['talk_script']
         result['question_type'] = 'listening'
         result['difficulty'] = difficulty
         
         return result
     
+    def generate_conversation_question(self, difficulty: str = "intermediate",
+                                       use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a TOEIC Part 3 style conversation question.
+        
+        Args:
+            difficulty: Question difficulty (beginner, intermediate, advanced)
+            use_cache: Serve from the question pool when one is available
+            
+        Returns:
+            Dictionary with conversation script, question, options, and answer
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.pop_unused('conversation', difficulty, None)
+            if cached is not None:
+                return cached
+        
+        result = generate_json(
+            self.model,
+            self._conversation_prompt(difficulty),
+            _CONVERSATION_CONFIG
+        )
+        
+        return self._finish_conversation(result, difficulty)
+    
+    def generate_talk_question(self, difficulty: str = "intermediate",
+                               use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a TOEIC Part 4 style talk/announcement question.
+        
+        Args:
+            difficulty: Question difficulty
+            use_cache: Serve from the question pool when one is available
+            
+        Returns:
+            Dictionary with talk script, question, options, and answer
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.pop_unused('talk', difficulty, None)
+            if cached is not None:
+                return cached
+        
+        result = generate_json(
+            self.model,
+            self._talk_prompt(difficulty),
+            _TALK_CONFIG
+        )
+        
+        return self._finish_talk(result, difficulty)
+    
     def generate_question(self, difficulty: str = "intermediate", 
                          question_style: Optional[str] = None) -> Dict[str, Any]:
         """Generate a listening question (randomly choose conversation or talk).
@@ -161,3 +196,32 @@ Return ONLY valid JSON in this exact format:
             return self.generate_conversation_question(difficulty)
         else:
             return self.generate_talk_question(difficulty)
+    
+    def generate_batch(self, difficulty: str, n: int,
+                       question_style: str = 'conversation') -> List[Dict[str, Any]]:
+        """Generate n listening questions with a single Gemini request.
+        
+        Used to refill the question pool; never consults the cache.
+        
+        Args:
+            difficulty: Question difficulty
+            n: Number of questions to generate
+            question_style: 'conversation' or 'talk'
+            
+        Returns:
+            List of question dictionaries (may be shorter than n)
+        """
+        if question_style == 'conversation':
+            prompt, finish = self._conversation_prompt(difficulty), self._finish_conversation
+            generation_config = _CONVERSATION_BATCH_CONFIG
+        else:
+            prompt, finish = self._talk_prompt(difficulty), self._finish_talk
+            generation_config = _TALK_BATCH_CONFIG
+        
+        results = generate_json(
+            self.model,
+            batch_prompt(prompt, n),
+            generation_config
+        )
+        
+        return [finish(result, difficulty) for result in parse_batch(results)[:n]]
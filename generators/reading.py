@@ -1,36 +1,22 @@
 """Generate TOEIC-style reading comprehension questions."""
-from typing import Dict, Any
-import google.generativeai as genai
-import json
+from typing import Dict, Any, List, Optional
 
-from config import config
+from .cache import QuestionCache
+from .gemini import SYSTEM_PREAMBLE, batch_prompt, generate_json, get_model, json_config, parse_batch
+from .schemas import ReadingQuestion
 
+_READING_CONFIG = json_config(ReadingQuestion)
+_READING_BATCH_CONFIG = json_config(list[ReadingQuestion])
 
-class ReadingGenerator:
-    """Generate TOEIC Part 7 reading comprehension questions."""
-    
-    def __init__(self):
-        genai.configure(api_key=config.gemini_api_key)
-        self.model = genai.GenerativeModel('gemini-3-flash-preview')
-    
-    def generate_reading_question(self, difficulty: str = "intermediate") -> Dict[str, Any]:
-        """Generate a TOEIC Part 7 style reading comprehension question.
-        
-        Args:
-            difficulty: Question difficulty (beginner, intermediate, advanced)
-            
-        Returns:
-            Dictionary with passage, question, options, and answer
-        """
-        difficulty_prompts = {
-            "beginner": "simple, short business emails or messages with straightforward information",
-            "intermediate": "realistic business documents (emails, memos, notices) with moderate complexity",
-            "advanced": "complex business documents with multiple details and nuanced information"
-        }
-        
-        prompt = f"""Generate a TOEIC Part 7 style reading comprehension question.
+_READING_DIFFICULTY_HINTS = {
+    "beginner": "simple, short business emails or messages with straightforward information",
+    "intermediate": "realistic business documents (emails, memos, notices) with moderate complexity",
+    "advanced": "complex business documents with multiple details and nuanced information"
+}
+
+_READING_PROMPT_TEMPLATE = SYSTEM_PREAMBLE + """Generate a TOEIC Part 7 style reading comprehension question.
 
-Difficulty level: {difficulty} - {difficulty_prompts.get(difficulty, difficulty_prompts['intermediate'])}
+Difficulty level: {difficulty} - {difficulty_hint}
 
 Create a short business document (email, memo, notice, or advertisement) followed by ONE comprehension question with 4 multiple choice options.
 
@@ -60,19 +46,76 @@ Return ONLY valid JSON in this exact format:
   "correct_answer": "C",
   "explanation": "Brief explanation of why this is correct"
 }}"""
-        
-        response = self.model.generate_content(
-            f"""You are a TOEIC test question generator. Always return valid JSON.
 
-{prompt}""",
-            generation_config=genai.GenerationConfig(
-                temperature=0.8,
-                response_mime_type="application/json"
-            )
-        )
+
+class ReadingGenerator:
+    """Generate TOEIC Part 7 reading comprehension questions."""
+    
+    def __init__(self, cache: Optional[QuestionCache] = None):
+        """Initialize the generator.
         
-        result = json.loads(response.text)
+        Args:
+            cache: Optional question pool consulted before calling Gemini
+        """
+        self.model = get_model()
+        self.cache = cache
+    
+    @staticmethod
+    def _reading_prompt(difficulty: str) -> str:
+        """Fill the Part 7 reading prompt template."""
+        return _READING_PROMPT_TEMPLATE.format(
+            difficulty=difficulty,
+            difficulty_hint=_READING_DIFFICULTY_HINTS.get(difficulty, _READING_DIFFICULTY_HINTS['intermediate'])
+        )
+    
+    @staticmethod
+    def _finish_reading(result: Dict[str, Any], difficulty: str) -> Dict[str, Any]:
+        """Tag a decoded reading question with type and difficulty."""
         result['question_type'] = 'reading'
         result['difficulty'] = difficulty
         
         return result
+    
+    def generate_reading_question(self, difficulty: str = "intermediate",
+                                  use_cache: bool = True) -> Dict[str, Any]:
+        """Generate a TOEIC Part 7 style reading comprehension question.
+        
+        Args:
+            difficulty: Question difficulty (beginner, intermediate, advanced)
+            use_cache: Serve from the question pool when one is available
+            
+        Returns:
+            Dictionary with passage, question, options, and answer
+        """
+        if use_cache and self.cache is not None:
+            cached = self.cache.pop_unused('reading', difficulty, None)
+            if cached is not None:
+                return cached
+        
+        result = generate_json(
+            self.model,
+            self._reading_prompt(difficulty),
+            _READING_CONFIG
+        )
+        
+        return self._finish_reading(result, difficulty)
+    
+    def generate_batch(self, difficulty: str, n: int) -> List[Dict[str, Any]]:
+        """Generate n reading questions with a single Gemini request.
+        
+        Used to refill the question pool; never consults the cache.
+        
+        Args:
+            difficulty: Question difficulty
+            n: Number of questions to generate
+            
+        Returns:
+            List of question dictionaries (may be shorter than n)
+        """
+        results = generate_json(
+            self.model,
+            batch_prompt(self._reading_prompt(difficulty), n),
+            _READING_BATCH_CONFIG
+        )
+        
+        return [self._finish_reading(result, difficulty) for result in parse_batch(results)[:n]]
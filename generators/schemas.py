@@ -0,0 +1,70 @@
+"""Response schemas for structured Gemini output."""
+# pydantic (used by the SDK to build the schema) needs this TypedDict before Python 3.12
+from typing_extensions import TypedDict
+
+
+class GrammarQuestion(TypedDict):
+    """TOEIC Part 5 grammar question."""
+    question_text: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_answer: str
+    explanation: str
+    grammar_point: str
+
+
+class VocabularyQuestion(TypedDict):
+    """TOEIC Part 5 vocabulary question."""
+    question_text: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_answer: str
+    explanation: str
+    vocabulary_word: str
+
+
+class ConversationLine(TypedDict):
+    """One exchange in a Part 3 conversation."""
+    speaker: str
+    text: str
+
+
+class ConversationQuestion(TypedDict):
+    """TOEIC Part 3 conversation question."""
+    conversation: list[ConversationLine]
+    question: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_answer: str
+    explanation: str
+
+
+class TalkQuestion(TypedDict):
+    """TOEIC Part 4 talk/announcement question."""
+    talk_script: str
+    question: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_answer: str
+    explanation: str
+
+
+class ReadingQuestion(TypedDict):
+    """TOEIC Part 7 reading comprehension question."""
+    document_type: str
+    passage: str
+    question: str
+    option_a: str
+    option_b: str
+    option_c: str
+    option_d: str
+    correct_answer: str
+    explanation: str
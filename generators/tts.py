@@ -1,14 +1,38 @@
 """Text-to-speech generation for listening exercises."""
+import asyncio
+import hashlib
+import itertools
 import os
+import shutil
+import subprocess
+import threading
+from io import BytesIO
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from gtts import gTTS
 
 from config import config
 
+# Per-process sequence number for temporary synthesis files, so concurrent
+# misses on the same script never write to the same path
+_AUDIO_COUNTER = itertools.count()
+
+# Eviction trims the cache to this fraction of its limit, so the directory
+# is scanned once per batch of stores rather than on every store at the limit
+_CACHE_LOW_WATER = 0.9
+
 
 class TTSGenerator:
-    """Generate audio files from text using Google Text-to-Speech (gTTS)."""
+    """Generate audio files from text using Google Text-to-Speech (gTTS).
+    
+    Synthesized audio is cached on disk under ``<audio_dir>/tts_cache``, keyed
+    by a hash of the normalized script and voice settings, so a script that was
+    spoken before is served without calling gTTS again. The least recently
+    used files are evicted once the cache grows past ``TTS_CACHE_MAX_MB``.
+    
+    The async methods coalesce concurrent requests for the same script into a
+    single synthesis and run at most ``TTS_CONCURRENCY`` gTTS requests at once.
+    """
     
     def __init__(self, audio_dir: str = "audio"):
         """Initialize TTS generator.
@@ -18,32 +42,104 @@ class TTSGenerator:
         """
         self.audio_dir = Path(audio_dir)
         self.audio_dir.mkdir(exist_ok=True)
+        self.audio_dir_str = str(self.audio_dir)
+        
+        self.cache_dir_str = os.path.join(self.audio_dir_str, "tts_cache")
+        os.makedirs(self.cache_dir_str, exist_ok=True)
+        self.cache_max_bytes = config.tts_cache_max_mb * 1024 * 1024
+        
+        # Running cache size, measured by one scan on the first store
+        self._cache_bytes: Optional[int] = None
+        self._cache_lock = threading.Lock()
         
         self.language = config.tts_language
         self.speed = config.tts_speed
+        self.bitrate = config.tts_bitrate
+        
+        # Async cache misses in progress, and a cap on concurrent gTTS requests
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._synthesis_slots = asyncio.Semaphore(config.tts_concurrency)
+    
+    def cache_path(self, text: str) -> str:
+        """Content-addressed cache location for a script with the current voice settings."""
+        normalized = " ".join(text.split()).lower()
+        key = hashlib.sha256(
+            f"{self.language}|{self.speed < 1.0}|{self.bitrate}|{normalized}".encode()
+        ).hexdigest()
+        return os.path.join(self.cache_dir_str, f"{key}.mp3")
     
     def generate_audio(self, text: str, filename: Optional[str] = None) -> str:
-        """Generate audio file from text.
+        """Generate audio file from text, reusing cached audio when available.
         
         Args:
             text: Text to convert to speech
-            filename: Optional custom filename (without extension)
+            filename: Optional custom filename (without extension); the cached
+                file is linked there. Without it the cache path is returned.
             
         Returns:
             Path to generated audio file
         """
+        cache_path = self.cache_path(text)
+        
+        if os.path.exists(cache_path):
+            # Cache hit: mark as recently used for eviction
+            os.utime(cache_path)
+        else:
+            self._store(cache_path, self._synthesize(text))
+        
         if filename is None:
-            # Generate filename from timestamp
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"toeic_{timestamp}"
+            return cache_path
         
         # Ensure .mp3 extension
         if not filename.endswith(".mp3"):
             filename = f"{filename}.mp3"
         
-        filepath = self.audio_dir / filename
+        filepath = os.path.join(self.audio_dir_str, filename)
+        if os.path.lexists(filepath):
+            os.remove(filepath)
+        try:
+            os.link(cache_path, filepath)
+        except OSError:
+            # File system without hard link support
+            shutil.copyfile(cache_path, filepath)
         
+        return filepath
+    
+    def generate_audio_bytes(self, text: str) -> bytes:
+        """Generate MP3 audio in memory, reusing cached audio when available.
+        
+        Freshly synthesized audio is also written to the cache, but callers
+        that send it right away skip reading it back from disk.
+        
+        Args:
+            text: Text to convert to speech
+            
+        Returns:
+            MP3 audio data
+        """
+        cache_path = self.cache_path(text)
+        
+        try:
+            with open(cache_path, 'rb') as f:
+                audio = f.read()
+        except FileNotFoundError:
+            audio = self._synthesize(text)
+            self._store(cache_path, audio)
+        else:
+            # Cache hit: mark as recently used for eviction
+            os.utime(cache_path)
+        
+        return audio
+    
+    def _synthesize(self, text: str) -> bytes:
+        """Synthesize speech with gTTS into memory.
+        
+        Args:
+            text: Text to convert to speech
+            
+        Returns:
+            MP3 audio data, downmixed to a low mono bitrate if configured
+        """
         # Generate speech using gTTS
         tts = gTTS(
             text=text,
@@ -51,10 +147,129 @@ class TTSGenerator:
             slow=(self.speed < 1.0)  # gTTS uses 'slow' boolean instead of speed float
         )
         
-        # Save to file
-        tts.save(str(filepath))
+        buf = BytesIO()
+        tts.write_to_fp(buf)
+        if self.bitrate:
+            return self._compress(buf.getvalue())
+        return buf.getvalue()
+    
+    def _compress(self, audio: bytes) -> bytes:
+        """Pipe MP3 audio through ffmpeg to a mono MP3 at the configured bitrate."""
+        return subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-f", "mp3", "-i", "pipe:0",
+             "-ac", "1", "-b:a", self.bitrate, "-f", "mp3", "pipe:1"],
+            input=audio,
+            stdout=subprocess.PIPE,
+            check=True
+        ).stdout
+    
+    def _store(self, cache_path: str, audio: bytes):
+        """Write audio into the cache atomically, then enforce the size limit.
+        
+        The cache size is tracked incrementally; the directory is only
+        scanned on the first store and when the limit is exceeded.
+        
+        Args:
+            cache_path: Final cache file path
+            audio: MP3 audio data
+        """
+        tmp_path = f"{cache_path}.{next(_AUDIO_COUNTER)}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, cache_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        
+        with self._cache_lock:
+            if self._cache_bytes is None:
+                self._cache_bytes = self._evict_cache()
+            else:
+                self._cache_bytes += len(audio)
+                if self._cache_bytes > self.cache_max_bytes:
+                    self._cache_bytes = self._evict_cache()
+    
+    def _evict_cache(self) -> int:
+        """Delete least recently used cache files once the cache exceeds its size limit.
+        
+        Returns:
+            Size of the cache in bytes after eviction
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.cache_dir_str) as it:
+            for entry in it:
+                if entry.name.endswith(".mp3") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
         
-        return str(filepath)
+        if total <= self.cache_max_bytes:
+            return total
+        
+        entries.sort()
+        target = self.cache_max_bytes * _CACHE_LOW_WATER
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        
+        return total
+    
+    async def agenerate_audio(self, text: str, filename: Optional[str] = None) -> str:
+        """Async variant of generate_audio.
+        
+        gTTS synthesizes over a blocking HTTP request, so the work runs in a
+        worker thread to keep the event loop responsive.
+        """
+        await self._ensure_cached(text)
+        return await asyncio.to_thread(self.generate_audio, text, filename)
+    
+    async def agenerate_audio_bytes(self, text: str) -> bytes:
+        """Async variant of generate_audio_bytes, run in a worker thread."""
+        audio = await self._ensure_cached(text)
+        if audio is not None:
+            return audio
+        return await asyncio.to_thread(self.generate_audio_bytes, text)
+    
+    async def _ensure_cached(self, text: str) -> Optional[bytes]:
+        """Make sure a script's audio is in the cache, sharing one synthesis per script.
+        
+        Misses take a synthesis slot, and callers asking for the same script
+        meanwhile, through either async method, await the first caller's
+        synthesis.
+        
+        Returns:
+            The freshly synthesized audio, or None if it was already cached
+        """
+        cache_path = self.cache_path(text)
+        if os.path.exists(cache_path):
+            return None
+        
+        task = self._inflight.get(cache_path)
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize_in_slot(text, cache_path))
+            self._inflight[cache_path] = task
+            task.add_done_callback(lambda _: self._inflight.pop(cache_path, None))
+        
+        # Shielded so one cancelled waiter does not cancel the shared work
+        return await asyncio.shield(task)
+    
+    async def _synthesize_in_slot(self, text: str, cache_path: str) -> bytes:
+        """Synthesize a script into the cache once a synthesis slot is free."""
+        async with self._synthesis_slots:
+            return await asyncio.to_thread(self._synthesize_into_cache, text, cache_path)
+    
+    def _synthesize_into_cache(self, text: str, cache_path: str) -> bytes:
+        """Synthesize a script, store it in the cache and return the audio."""
+        audio = self._synthesize(text)
+        self._store(cache_path, audio)
+        return audio
     
     def generate_conversation_audio(self, speakers: list[dict], filename: Optional[str] = None) -> str:
         """Generate audio for a multi-speaker conversation.
@@ -69,11 +284,7 @@ class TTSGenerator:
         Returns:
             Path to generated audio file
         """
-        # Combine all speaker text with slight formatting
-        full_text = ""
-        for item in speakers:
-            speaker = item.get('speaker', 'Speaker')
-            text = item.get('text', '')
-            full_text += f"{text} ... "  # Add pause between speakers
-        
-        return self.generate_audio(full_text.strip(), filename)
+        # Combine all non-empty speaker text, with a pause between speakers
+        full_text = " ... ".join(item['text'] for item in speakers if item.get('text'))
+        
+        return self.generate_audio(full_text, filename)
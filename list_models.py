@@ -1,11 +1,9 @@
 """List available Gemini models."""
 import google.generativeai as genai
-import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from config import config
 
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+genai.configure(api_key=config.gemini_api_key)
 
 print("Available Gemini models:")
 print("=" * 60)
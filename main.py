@@ -1,19 +1,27 @@
 """Main TOEIC Bot application."""
+import asyncio
 import logging
 from datetime import datetime
-from telegram import Update
+from functools import partial
+from html import escape as _escape
+from time import monotonic
+from typing import Any, Dict, Tuple
+from telegram import BotCommand, InlineKeyboardMarkup, Update
 from telegram.ext import (
     Application,
     CommandHandler,
     CallbackQueryHandler,
     ContextTypes,
 )
-import threading
 
-from config import config
-from database import init_db, get_session, DatabaseOperations
+from config import config, TELEGRAM_TOKEN
+from database import init_db, session_scope, DatabaseOperations
 from formatters import TelegramFormatter
-from scheduler import DailyScheduler
+from generators.cache import QuestionCache, PoolRefillWorker, DIFFICULTY_LEVELS
+from generators.grammar import GrammarGenerator
+from generators.listening import ListeningGenerator
+from generators.reading import ReadingGenerator
+from scheduler import DailyScheduler, TELEGRAM_CAPTION_LIMIT, TELEGRAM_MESSAGE_LIMIT
 
 # Setup logging
 logging.basicConfig(
@@ -22,6 +30,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Daily grammar focus, indexed by weekday (0=Monday, 6=Sunday)
+GRAMMAR_TOPICS = (
+    "Tenses", "Conditionals", "Active/Passive Voice", "Participles",
+    "Infinitives/Gerunds", "Relative Clauses", "Comparatives/Superlatives"
+)
+GRAMMAR_TOPICS_FULL = (
+    "Tenses (Present, Past, Future, Perfect)",  # Monday
+    "Conditionals (If clauses, Hypothetical situations)",  # Tuesday
+    "Active and Passive Voice",  # Wednesday
+    "Participles (Present/Past participles, Participial phrases)",  # Thursday
+    "Infinitives and Gerunds",  # Friday
+    "Relative Clauses (Who, Which, That, Whose)",  # Saturday
+    "Comparatives and Superlatives"  # Sunday
+)
+
+WELCOME_TEMPLATE = """👋 <b>Welcome to TOEIC Practice Bot!</b>
+
+🎯 Practice TOEIC questions daily and track your progress!
+
+📅 <b>Today's Grammar Focus:</b> {today_topic}
+
+<b>Available Commands:</b>
+/practice - Get instant practice questions (Grammar + Reading)
+/stats - View your learning statistics
+/settings - Check your settings
+/help - Show help information
+
+💡 <b>Tip:</b> Use /practice anytime to get questions on today's grammar topic!
+
+Ready to start? Type /practice now! 🚀"""
+
+# One pre-rendered welcome message per weekday
+_WELCOME_MESSAGES = tuple(
+    WELCOME_TEMPLATE.format(today_topic=_escape(topic)) for topic in GRAMMAR_TOPICS
+)
+
+# Weekday lookups are cached briefly so one request sees a single value
+_WEEKDAY_TTL_SECONDS = 60
+_WEEKDAY_CACHE = {"ts": float("-inf"), "val": 0}
+
+# Answer button callback data: answer_<question_id>_<letter>
+_ANSWER_PREFIX = "answer_"
+_ANSWER_LETTERS = frozenset("ABCD")
+
+_OPTION_PREFIXES = ("A) ", "B) ", "C) ", "D) ")
+_OPTION_KEYS = ('option_a', 'option_b', 'option_c', 'option_d')
+
+
+def current_weekday() -> int:
+    """Return today's weekday (0=Monday), recomputed at most once a minute."""
+    now = monotonic()
+    if now - _WEEKDAY_CACHE["ts"] >= _WEEKDAY_TTL_SECONDS:
+        _WEEKDAY_CACHE["val"] = datetime.now().weekday()
+        _WEEKDAY_CACHE["ts"] = now
+    return _WEEKDAY_CACHE["val"]
+
+
+def _options_block(question: Dict[str, Any]) -> str:
+    """Render a question's four HTML-escaped answer options, one per line."""
+    return "\n".join(
+        prefix + _escape(question[key]) for prefix, key in zip(_OPTION_PREFIXES, _OPTION_KEYS)
+    )
+
 
 class TOEICBot:
     """TOEIC learning bot for Telegram."""
@@ -30,46 +101,108 @@ class TOEICBot:
         """Initialize the bot."""
         self.engine = init_db(config.database_url)
         self.formatter = TelegramFormatter()
+        self.question_cache = QuestionCache(self.engine)
+        self.grammar_gen = GrammarGenerator(cache=self.question_cache)
+        self.reading_gen = ReadingGenerator(cache=self.question_cache)
+        self.listening_gen = ListeningGenerator(cache=self.question_cache)
+        self.pool_worker = PoolRefillWorker(
+            self.question_cache, self._pool_buckets, config.question_pool_depth
+        )
         logger.info("TOEIC Bot initialized")
     
+    @staticmethod
+    def _practice_topic() -> str:
+        """Return today's grammar focus for /practice based on day of week."""
+        return GRAMMAR_TOPICS_FULL[current_weekday()]
+    
+    def _pool_buckets(self):
+        """Yield the question pool buckets /practice and daily delivery draw from, with batch producers."""
+        topic = self._practice_topic()
+        
+        for difficulty in DIFFICULTY_LEVELS:
+            # /practice
+            yield 'grammar', difficulty, topic, partial(self.grammar_gen.generate_batch, difficulty, grammar_point=topic)
+            yield 'reading', difficulty, None, partial(self.reading_gen.generate_batch, difficulty)
+            
+            # Daily delivery
+            yield 'grammar', difficulty, None, partial(self.grammar_gen.generate_batch, difficulty, focus='grammar')
+            yield 'vocabulary', difficulty, None, partial(self.grammar_gen.generate_batch, difficulty, focus='vocabulary')
+            yield 'conversation', difficulty, None, partial(
+                self.listening_gen.generate_batch, difficulty, question_style='conversation'
+            )
+            yield 'talk', difficulty, None, partial(self.listening_gen.generate_batch, difficulty, question_style='talk')
+    
+    async def _prewarm_question_pool(self):
+        """Fill the question pool in the background so /practice can skip Gemini."""
+        await asyncio.to_thread(self.pool_worker.run_once)
+        logger.info("Question pool prewarmed")
+    
+    # Blocking database work; handlers run these in worker threads via asyncio.to_thread
+    def _register_user(self, telegram_id: int, username: str = None, first_name: str = None):
+        """Create the user on first contact, or refresh their last activity."""
+        with session_scope(self.engine) as session:
+            DatabaseOperations(session).get_or_create_user(
+                telegram_id=telegram_id,
+                username=username,
+                first_name=first_name
+            )
+    
+    def _load_stats(self, telegram_id: int) -> Dict[str, Any]:
+        """Load the statistics shown by /stats."""
+        with session_scope(self.engine) as session:
+            return DatabaseOperations(session).get_user_stats(telegram_id)
+    
+    def _load_settings(self, telegram_id: int) -> Dict[str, Any]:
+        """Load the settings shown by /settings."""
+        with session_scope(self.engine) as session:
+            user_obj = DatabaseOperations(session).get_or_create_user(telegram_id)
+            return {
+                'delivery_time': user_obj.delivery_time,
+                'timezone': user_obj.timezone,
+                'difficulty_level': user_obj.difficulty_level,
+                'target_score': user_obj.target_score,
+            }
+    
+    def _set_subscription(self, telegram_id: int, active: bool) -> bool:
+        """Enable or disable daily delivery.
+        
+        Returns:
+            True if the subscription changed, False if it was already in that state
+        """
+        with session_scope(self.engine) as session:
+            db_ops = DatabaseOperations(session)
+            user_obj = db_ops.get_or_create_user(telegram_id)
+            if user_obj.is_active == active:
+                return False
+            
+            db_ops.update_user_preferences(telegram_id, is_active=active)
+            return True
+    
+    def _user_difficulty(self, telegram_id: int) -> str:
+        """Return the user's difficulty level, registering them if needed."""
+        with session_scope(self.engine) as session:
+            return DatabaseOperations(session).get_or_create_user(telegram_id).difficulty_level
+    
+    def _save_question(self, question_data: Dict[str, Any]) -> int:
+        """Store a generated question and return its ID."""
+        with session_scope(self.engine) as session:
+            return DatabaseOperations(session).insert_question(question_data)
+    
+    def _save_answer(self, telegram_id: int, question_id: int,
+                     user_answer: str) -> Tuple[bool, str, str]:
+        """Record an answer and return (is_correct, correct_answer, explanation)."""
+        with session_scope(self.engine) as session:
+            return DatabaseOperations(session).record_answer(telegram_id, question_id, user_answer)
+    
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command."""
         user = update.effective_user
         
         # Register user in database
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        db_ops.get_or_create_user(
-            telegram_id=user.id,
-            username=user.username,
-            first_name=user.first_name
-        )
-        session.close()
+        await asyncio.to_thread(self._register_user, user.id, user.username, user.first_name)
         
-        # Get today's grammar topic
-        weekday = datetime.now().weekday()
-        grammar_topics = {
-            0: "Tenses", 1: "Conditionals", 2: "Active/Passive Voice",
-            3: "Participles", 4: "Infinitives/Gerunds", 5: "Relative Clauses",
-            6: "Comparatives/Superlatives"
-        }
-        today_topic = grammar_topics[weekday]
-        
-        welcome_msg = f"""👋 <b>Welcome to TOEIC Practice Bot!</b>
-
-🎯 Practice TOEIC questions daily and track your progress!
-
-📅 <b>Today's Grammar Focus:</b> {today_topic}
-
-<b>Available Commands:</b>
-/practice - Get instant practice questions (Grammar + Reading)
-/stats - View your learning statistics
-/settings - Check your settings
-/help - Show help information
-
-💡 <b>Tip:</b> Use /practice anytime to get questions on today's grammar topic!
-
-Ready to start? Type /practice now! 🚀"""
+        # Welcome message with today's grammar topic
+        welcome_msg = _WELCOME_MESSAGES[current_weekday()]
         
         await update.message.reply_text(welcome_msg, parse_mode='HTML')
         logger.info(f"User {user.id} started the bot")
@@ -83,10 +216,7 @@ Ready to start? Type /practice now! 🚀"""
         """Handle /stats command."""
         user = update.effective_user
         
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        stats = db_ops.get_user_stats(user.id)
-        session.close()
+        stats = await asyncio.to_thread(self._load_stats, user.id)
         
         if not stats:
             await update.message.reply_text("No statistics yet. Start answering questions!")
@@ -99,47 +229,30 @@ Ready to start? Type /practice now! 🚀"""
         """Handle /settings command."""
         user = update.effective_user
         
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        user_obj = db_ops.get_or_create_user(user.id)
-        
-        settings_msg = self.formatter.format_settings_message({
-            'delivery_time': user_obj.delivery_time,
-            'timezone': user_obj.timezone,
-            'difficulty_level': user_obj.difficulty_level,
-            'target_score': user_obj.target_score,
-        })
-        
-        session.close()
+        settings = await asyncio.to_thread(self._load_settings, user.id)
+        settings_msg = self.formatter.format_settings_message(settings)
         await update.message.reply_text(settings_msg, parse_mode='Markdown')
     
     async def subscribe_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /subscribe command - enable daily questions."""
         user = update.effective_user
         
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        user_obj = db_ops.get_or_create_user(user.id)
-        
-        if user_obj.is_active:
-            msg = """✅ <b>You're already subscribed!</b>
+        if not await asyncio.to_thread(self._set_subscription, user.id, True):
+            msg = f"""✅ <b>You're already subscribed!</b>
 
-You'll receive daily TOEIC questions every day at 07:00.
+You'll receive daily TOEIC questions every day at {config.daily_delivery_time}.
 
 💡 Use /unsubscribe to stop daily delivery (you can still use /practice anytime!)"""
         else:
-            # Activate subscription
-            db_ops.update_user_preferences(user.id, is_active=True)
-            msg = """🎉 <b>Successfully subscribed!</b>
+            msg = f"""🎉 <b>Successfully subscribed!</b>
 
-Starting tomorrow at 07:00, you'll receive:
+Starting tomorrow at {config.daily_delivery_time}, you'll receive:
 • 1 Grammar question (based on daily topic)
 • 1 Reading comprehension question
 
 💡 You can still use /practice anytime for instant questions!
 📴 Use /unsubscribe to stop daily delivery"""
         
-        session.close()
         await update.message.reply_text(msg, parse_mode='HTML')
         logger.info(f"User {user.id} subscribed to daily questions")
     
@@ -147,11 +260,7 @@ Starting tomorrow at 07:00, you'll receive:
         """Handle /unsubscribe command - disable daily questions."""
         user = update.effective_user
         
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        user_obj = db_ops.get_or_create_user(user.id)
-        
-        if not user_obj.is_active:
+        if not await asyncio.to_thread(self._set_subscription, user.id, False):
             msg = """ℹ️ <b>You're already unsubscribed!</b>
 
 You won't receive automatic daily questions.
@@ -159,8 +268,6 @@ You won't receive automatic daily questions.
 💡 You can still use /practice anytime for instant questions!
 🔔 Use /subscribe to re-enable daily delivery"""
         else:
-            # Deactivate subscription
-            db_ops.update_user_preferences(user.id, is_active=False)
             msg = """👋 <b>Successfully unsubscribed!</b>
 
 You won't receive automatic daily questions anymore.
@@ -168,7 +275,6 @@ You won't receive automatic daily questions anymore.
 💡 You can still use /practice anytime for instant questions!
 🔔 Use /subscribe to re-enable daily delivery"""
         
-        session.close()
         await update.message.reply_text(msg, parse_mode='HTML')
         logger.info(f"User {user.id} unsubscribed from daily questions")
     
@@ -177,40 +283,33 @@ You won't receive automatic daily questions anymore.
         user = update.effective_user
         
         # Determine today's grammar focus based on day of week
-        weekday = datetime.now().weekday()  # 0=Monday, 6=Sunday
-        grammar_topics = {
-            0: "Tenses (Present, Past, Future, Perfect)",  # Monday
-            1: "Conditionals (If clauses, Hypothetical situations)",  # Tuesday
-            2: "Active and Passive Voice",  # Wednesday
-            3: "Participles (Present/Past participles, Participial phrases)",  # Thursday
-            4: "Infinitives and Gerunds",  # Friday
-            5: "Relative Clauses (Who, Which, That, Whose)",  # Saturday
-            6: "Comparatives and Superlatives"  # Sunday
-        }
-        
-        today_topic = grammar_topics[weekday]
+        today_topic = self._practice_topic()
         
         await update.message.reply_text(f"🎯 Generating practice questions... Please wait!\n\n📅 Today's grammar focus: <b>{today_topic}</b>", parse_mode='HTML')
         
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        user_obj = db_ops.get_or_create_user(user.id)
+        difficulty = await asyncio.to_thread(self._user_difficulty, user.id)
         
-        # Import generators
-        from generators.grammar import GrammarGenerator
-        from generators.listening import ListeningGenerator
-        import html
+        # Generate both questions concurrently; each waits on its own Gemini call
+        grammar_q, reading_q = await asyncio.gather(
+            asyncio.to_thread(
+                self.grammar_gen.generate_grammar_question,
+                difficulty=difficulty,
+                grammar_point=today_topic
+            ),
+            asyncio.to_thread(
+                self.reading_gen.generate_reading_question,
+                difficulty=difficulty
+            ),
+            return_exceptions=True
+        )
         
-        # Generate and send grammar question with specific topic
+        # Send grammar question with specific topic
         try:
-            grammar_gen = GrammarGenerator()
-            grammar_q = grammar_gen.generate_grammar_question(
-                difficulty=user_obj.difficulty_level,
-                grammar_point=today_topic
-            )
+            if isinstance(grammar_q, Exception):
+                raise grammar_q
             
             # Save to database
-            question_obj = db_ops.save_question({
+            question_id = await asyncio.to_thread(self._save_question, {
                 'question_type': 'grammar',
                 'question_text': grammar_q['question_text'],
                 'option_a': grammar_q['option_a'],
@@ -219,32 +318,20 @@ You won't receive automatic daily questions anymore.
                 'option_d': grammar_q['option_d'],
                 'correct_answer': grammar_q['correct_answer'],
                 'explanation': grammar_q['explanation'],
-                'difficulty': user_obj.difficulty_level
+                'difficulty': difficulty
             })
             
             # Format and send message
             msg = f"""📚 <b>TOEIC Grammar Question</b>
 
-{html.escape(grammar_q['question_text'])}
+{_escape(grammar_q['question_text'])}
 
-A) {html.escape(grammar_q['option_a'])}
-B) {html.escape(grammar_q['option_b'])}
-C) {html.escape(grammar_q['option_c'])}
-D) {html.escape(grammar_q['option_d'])}
+{_options_block(grammar_q)}
 
-<i>Difficulty: {user_obj.difficulty_level}</i>"""
+<i>Difficulty: {difficulty}</i>"""
             
             # Create buttons
-            from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-            keyboard = [
-                [
-                    InlineKeyboardButton("A", callback_data=f"answer_{question_obj.id}_A"),
-                    InlineKeyboardButton("B", callback_data=f"answer_{question_obj.id}_B"),
-                    InlineKeyboardButton("C", callback_data=f"answer_{question_obj.id}_C"),
-                    InlineKeyboardButton("D", callback_data=f"answer_{question_obj.id}_D"),
-                ]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = self.formatter.create_answer_keyboard(question_id)
             
             await update.message.reply_text(msg, parse_mode='HTML', reply_markup=reply_markup)
             
@@ -252,14 +339,13 @@ D) {html.escape(grammar_q['option_d'])}
             logger.error(f"Error generating grammar question: {e}")
             await update.message.reply_text(f"❌ Error generating grammar question: {e}")
         
-        # Generate and send reading question
+        # Send reading question
         try:
-            from generators.reading import ReadingGenerator
-            reading_gen = ReadingGenerator()
-            reading_q = reading_gen.generate_reading_question(difficulty=user_obj.difficulty_level)
+            if isinstance(reading_q, Exception):
+                raise reading_q
             
             # Save to database
-            question_obj = db_ops.save_question({
+            question_id = await asyncio.to_thread(self._save_question, {
                 'question_type': 'reading',
                 'question_text': reading_q['question'],
                 'option_a': reading_q['option_a'],
@@ -268,36 +354,25 @@ D) {html.escape(grammar_q['option_d'])}
                 'option_d': reading_q['option_d'],
                 'correct_answer': reading_q['correct_answer'],
                 'explanation': reading_q['explanation'],
-                'difficulty': user_obj.difficulty_level
+                'difficulty': difficulty
             })
             
             # Format message with passage
-            passage = html.escape(reading_q['passage'])
-            doc_type = html.escape(reading_q.get('document_type', 'Document'))
+            passage = _escape(reading_q['passage'])
+            doc_type = _escape(reading_q.get('document_type', 'Document'))
             
             msg = f"""📖 <b>TOEIC Reading Question</b>
 
 <b>{doc_type}:</b>
 {passage}
 
-<b>Question:</b> {html.escape(reading_q['question'])}
+<b>Question:</b> {_escape(reading_q['question'])}
 
-A) {html.escape(reading_q['option_a'])}
-B) {html.escape(reading_q['option_b'])}
-C) {html.escape(reading_q['option_c'])}
-D) {html.escape(reading_q['option_d'])}
+{_options_block(reading_q)}
 
-<i>Difficulty: {user_obj.difficulty_level}</i>"""
+<i>Difficulty: {difficulty}</i>"""
             
-            keyboard = [
-                [
-                    InlineKeyboardButton("A", callback_data=f"answer_{question_obj.id}_A"),
-                    InlineKeyboardButton("B", callback_data=f"answer_{question_obj.id}_B"),
-                    InlineKeyboardButton("C", callback_data=f"answer_{question_obj.id}_C"),
-                    InlineKeyboardButton("D", callback_data=f"answer_{question_obj.id}_D"),
-                ]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
+            reply_markup = self.formatter.create_answer_keyboard(question_id)
             
             await update.message.reply_text(msg, parse_mode='HTML', reply_markup=reply_markup)
             
@@ -305,7 +380,6 @@ D) {html.escape(reading_q['option_d'])}
             logger.error(f"Error generating reading question: {e}")
             await update.message.reply_text(f"❌ Error generating reading question: {e}")
         
-        session.close()
         logger.info(f"User {user.id} requested practice questions")
     
     async def handle_answer(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -314,46 +388,69 @@ D) {html.escape(reading_q['option_d'])}
         await query.answer()
         
         # Parse callback data: answer_<question_id>_<answer>
-        parts = query.data.split('_')
-        if len(parts) != 3 or parts[0] != 'answer':
+        data = query.data
+        if not data.startswith(_ANSWER_PREFIX):
+            return
+        
+        qid_str, _, user_answer = data[len(_ANSWER_PREFIX):].rpartition('_')
+        if not qid_str.isdigit() or user_answer not in _ANSWER_LETTERS:
             return
         
-        question_id = int(parts[1])
-        user_answer = parts[2]
+        question_id = int(qid_str)
         user = update.effective_user
         
         # Save response
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
-        
-        user_obj = db_ops.get_or_create_user(user.id)
-        response = db_ops.save_response(user_obj.id, question_id, user_answer)
-        question = db_ops.get_question_by_id(question_id)
-        
-        # Format result
-        result_msg = self.formatter.format_answer_result(
-            response.is_correct,
-            question.correct_answer,
-            question.explanation
+        is_correct, correct_answer, explanation = await asyncio.to_thread(
+            self._save_answer, user.id, question_id, user_answer
         )
         
-        session.close()
+        # Format result
+        result_msg = self.formatter.format_answer_result(is_correct, correct_answer, explanation)
+        
+        # Keep the buttons of any other questions sharing this message
+        message = query.message
+        rows = message.reply_markup.inline_keyboard if message.reply_markup else ()
+        answer_prefix = f"{_ANSWER_PREFIX}{question_id}_"
+        answered = [row for row in rows if row[0].callback_data.startswith(answer_prefix)]
+        remaining = [row for row in rows if not row[0].callback_data.startswith(answer_prefix)]
+        reply_markup = InlineKeyboardMarkup(remaining) if remaining else None
+        
+        # On a shared keyboard, say which question the result belongs to;
+        # its buttons are labelled with the question number (1A, 1B, ...)
+        label = answered[0][0].text if answered else ""
+        if label[:-1].isdigit():
+            result_msg = f"Question {label[:-1]}: {result_msg}"
+        
+        # Edit message to show result; audio messages carry it in the caption
+        if message.text is None:
+            caption = (message.caption or "") + f"\n\n{result_msg}"
+            fits = len(caption) <= TELEGRAM_CAPTION_LIMIT
+            if fits:
+                await query.edit_message_caption(caption=caption, reply_markup=reply_markup, parse_mode='HTML')
+        else:
+            text = message.text + f"\n\n{result_msg}"
+            fits = len(text) <= TELEGRAM_MESSAGE_LIMIT
+            if fits:
+                await query.edit_message_text(text=text, reply_markup=reply_markup, parse_mode='HTML')
         
-        # Edit message to show result
-        await query.edit_message_text(
-            text=query.message.text + f"\n\n{result_msg}",
-            parse_mode='HTML'
-        )
+        # Too long to append: update the buttons and reply with the result
+        if not fits:
+            await query.edit_message_reply_markup(reply_markup=reply_markup)
+            await message.reply_text(result_msg, parse_mode='HTML')
         
-        logger.info(f"User {user.id} answered question {question_id}: {user_answer} (correct: {response.is_correct})")
+        logger.info(f"User {user.id} answered question {question_id}: {user_answer} (correct: {is_correct})")
     
     def run(self):
         """Run the bot."""
         # Create application
-        application = Application.builder().token(config.telegram_token).build()
+        application = Application.builder().token(TELEGRAM_TOKEN).build()
+        
+        # Daily delivery runs on the bot's event loop once polling starts
+        scheduler = DailyScheduler(
+            application.bot, pool_worker=self.pool_worker, question_cache=self.question_cache
+        )
         
         # Register bot commands (for Telegram menu)
-        from telegram import BotCommand
         async def post_init(app: Application):
             await app.bot.set_my_commands([
                 BotCommand("start", "Start the bot and see welcome message"),
@@ -364,8 +461,17 @@ D) {html.escape(reading_q['option_d'])}
                 BotCommand("settings", "Check your settings"),
                 BotCommand("help", "Show help information"),
             ])
+            
+            # Refill the question pool without delaying startup
+            app.create_task(self._prewarm_question_pool())
+            
+            scheduler.start()
+        
+        async def post_shutdown(app: Application):
+            scheduler.shutdown()
         
         application.post_init = post_init
+        application.post_shutdown = post_shutdown
         
         # Add handlers
         application.add_handler(CommandHandler("start", self.start_command))
@@ -379,12 +485,6 @@ D) {html.escape(reading_q['option_d'])}
         
         logger.info("Bot handlers registered")
         
-        # Start scheduler in separate thread
-        scheduler = DailyScheduler(application.bot)
-        scheduler_thread = threading.Thread(target=scheduler.start, daemon=True)
-        scheduler_thread.start()
-        logger.info("Scheduler thread started")
-        
         # Start bot
         logger.info("Starting bot...")
         application.run_polling(allowed_updates=Update.ALL_TYPES)
@@ -1,244 +1,527 @@
 """Daily content scheduler for TOEIC Bot."""
-import schedule
+import asyncio
+import math
 import time
-from datetime import datetime
-from typing import List
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
 import logging
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
+from telegram import InputMediaAudio
 
-from database import init_db, get_session, DatabaseOperations
-from generators import ListeningGenerator, GrammarGenerator, TTSGenerator
+from database import init_db, session_scope, DatabaseOperations
+from generators import ListeningGenerator, GrammarGenerator, TTSGenerator, QuestionCache, PoolRefillWorker
 from config import config
+from formatters import TelegramFormatter
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# How often the question pool is topped up between daily deliveries
+POOL_REFILL_INTERVAL_MINUTES = 60
+
+# Listening pool buckets whose audio the nightly prefetch synthesizes
+_LISTENING_POOL_TYPES = ('conversation', 'talk')
+
+# Pool buckets (topic None) daily delivery draws from, with the share of the
+# per-user question count each receives: the generators pick conversation or
+# talk, and grammar or vocabulary, at random
+_DELIVERY_BUCKET_SHARES = {
+    'conversation': ('listening_questions_per_day', 0.5),
+    'talk': ('listening_questions_per_day', 0.5),
+    'grammar': ('grammar_questions_per_day', 0.5),
+    'vocabulary': ('grammar_questions_per_day', 0.5),
+}
+
+# How late the daily delivery may still start (e.g. after a busy event loop)
+# instead of being skipped until the next day; a delivery missed while the
+# bot was down is caught up by start()
+DELIVERY_MISFIRE_GRACE_SECONDS = 3600
+
+# Telegram allows a bot about 30 messages per second across all chats
+TELEGRAM_MESSAGES_PER_SECOND = 30
+
+# Longest text and caption Telegram accepts on a message
+TELEGRAM_MESSAGE_LIMIT = 4096
+TELEGRAM_CAPTION_LIMIT = 1024
+
+# Audio files per media group (album) Telegram accepts: 2 to 10
+TELEGRAM_MEDIA_GROUP_LIMIT = 10
+
+_SEPARATOR = "━━━━━━━━━━━━━━━━━━━━━"
+_CLOSING_MESSAGE = f"{_SEPARATOR}\n💡 Answer at your convenience. Good luck! 화이팅!"
+
+_LISTENING_ANSWER_PROMPT = "🎧 **Answer the listening questions:**"
+
+_OPTION_FIELDS = ('option_a', 'option_b', 'option_c', 'option_d')
+
+
+def _expected_demand(draws: int, share: float) -> int:
+    """Pool depth covering a bucket that receives each of draws with probability share.
+    
+    Two standard deviations above the mean of the binomial split, so the
+    random choice between buckets rarely runs one dry.
+    """
+    mean = draws * share
+    return math.ceil(mean + 2 * math.sqrt(mean * (1 - share)))
+
+
+class _TokenBucket:
+    """Async token bucket limiting how fast deliveries call the Bot API."""
+    
+    def __init__(self, rate: float):
+        """Initialize the bucket.
+        
+        Args:
+            rate: Tokens added per second (also the burst size)
+        """
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
 
 class DailyScheduler:
     """Schedule and deliver daily TOEIC content."""
     
-    def __init__(self, bot_instance):
+    def __init__(self, bot_instance, pool_worker: Optional[PoolRefillWorker] = None,
+                 question_cache: Optional[QuestionCache] = None):
         """Initialize scheduler.
         
         Args:
             bot_instance: Telegram bot instance for sending messages
+            pool_worker: Optional worker that refills the question pool periodically
+            question_cache: Optional question pool served before calling Gemini
         """
         self.bot = bot_instance
+        self.pool_worker = pool_worker
+        self.question_cache = question_cache
+        self.scheduler = AsyncIOScheduler(timezone=config.timezone)
+        self.rate_limiter = _TokenBucket(TELEGRAM_MESSAGES_PER_SECOND)
+        self._delivery_lock = asyncio.Lock()
+        self.formatter = TelegramFormatter()
         self.engine = init_db(config.database_url)
         
-        # Generators
-        self.listening_gen = ListeningGenerator()
-        self.grammar_gen = GrammarGenerator()
+        # Generators, drawing from the pre-generated question pool when given
+        self.listening_gen = ListeningGenerator(cache=question_cache)
+        self.grammar_gen = GrammarGenerator(cache=question_cache)
         self.tts_gen = TTSGenerator()
         
         logger.info("DailyScheduler initialized")
     
-    def generate_daily_content(self, user, db_ops: DatabaseOperations) -> dict:
+    async def _generate_listening(self, difficulty: str) -> Dict[str, Any]:
+        """Generate one listening question and its audio in worker threads."""
+        q_data = await asyncio.to_thread(self.listening_gen.generate_question, difficulty)
+        
+        # Generate audio in memory, served from the TTS cache for known scripts
+        q_data['audio'] = await self.tts_gen.agenerate_audio_bytes(q_data['audio_script'])
+        return q_data
+    
+    def _save_daily_questions(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Store generated questions and return them with their database IDs."""
+        with session_scope(self.engine) as session:
+            question_ids = DatabaseOperations(session).save_questions_bulk(rows)
+        return [dict(row, id=question_id) for row, question_id in zip(rows, question_ids)]
+    
+    async def generate_daily_content(self, telegram_id: int, difficulty: str) -> dict:
         """Generate daily content for a user.
         
+        Listening and grammar questions are generated concurrently.
+        
         Args:
-            user: User database object
-            db_ops: DatabaseOperations instance
+            telegram_id: Telegram user ID (for logging)
+            difficulty: User's difficulty level
             
         Returns:
-            Dictionary with generated questions and audio files
+            Dictionary with saved listening and grammar question rows (including IDs)
         """
-        difficulty = user.difficulty_level
-        content = {
-            'listening_questions': [],
-            'grammar_questions': []
+        started = time.monotonic()
+        listening_results, grammar_results = await asyncio.gather(
+            asyncio.gather(
+                *(self._generate_listening(difficulty) for _ in range(config.listening_questions_per_day)),
+                return_exceptions=True
+            ),
+            self.grammar_gen.generate_many(config.grammar_questions_per_day, difficulty)
+        )
+        
+        listening_rows = []
+        listening_audio = []
+        for q_data in listening_results:
+            if isinstance(q_data, Exception):
+                logger.error("Error generating listening question for user %s", telegram_id, exc_info=q_data)
+                continue
+            
+            listening_rows.append({
+                'question_type': 'listening',
+                'difficulty': difficulty,
+                'question_text': q_data['question'],
+                **{field: q_data[field] for field in _OPTION_FIELDS},
+                'correct_answer': q_data['correct_answer'],
+                'explanation': q_data.get('explanation', ''),
+                # No audio_file_path: cached audio may be evicted, while the
+                # script regenerates it on demand
+                'audio_script': q_data['audio_script'],
+            })
+            listening_audio.append(q_data['audio'])
+        
+        grammar_rows = []
+        for q_data in grammar_results:
+            if isinstance(q_data, Exception):
+                logger.error("Error generating grammar question for user %s", telegram_id, exc_info=q_data)
+                continue
+            
+            grammar_rows.append({
+                'question_type': q_data['question_type'],
+                'difficulty': difficulty,
+                'question_text': q_data['question_text'],
+                **{field: q_data[field] for field in _OPTION_FIELDS},
+                'correct_answer': q_data['correct_answer'],
+                'explanation': q_data.get('explanation', ''),
+            })
+        
+        saved = await asyncio.to_thread(self._save_daily_questions, listening_rows + grammar_rows)
+        logger.info(
+            "Generated %d listening and %d grammar questions for user %s in %.2fs",
+            len(listening_rows), len(grammar_rows), telegram_id, time.monotonic() - started
+        )
+        
+        # Audio bytes travel with the rows so sending never re-reads the files
+        listening_questions = saved[:len(listening_rows)]
+        for question, audio in zip(listening_questions, listening_audio):
+            question['audio'] = audio
+        
+        return {
+            'listening_questions': listening_questions,
+            'grammar_questions': saved[len(listening_rows):]
         }
+    
+    def _load_stats(self, telegram_id: int) -> Dict[str, Any]:
+        """Load a user's stats for the daily intro."""
+        with session_scope(self.engine) as session:
+            return DatabaseOperations(session).get_user_stats(telegram_id)
+    
+    def _listening_message(self, question: Dict[str, Any]) -> str:
+        """Format a saved listening question row for Telegram."""
+        return self.formatter.format_listening_question({
+            'question': question['question_text'],
+            **{field: question[field] for field in _OPTION_FIELDS},
+        }, question['id'])
+    
+    async def _send_listening(self, telegram_id: int, questions: List[Dict[str, Any]]):
+        """Send listening questions with their audio.
         
-        # Generate listening questions
-        for i in range(config.listening_questions_per_day):
-            try:
-                # Generate question
-                q_data = self.listening_gen.generate_question(difficulty)
-                
-                # Generate audio
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                audio_filename = f"listening_{user.telegram_id}_{timestamp}_{i}"
-                audio_path = self.tts_gen.generate_audio(
-                    q_data['audio_script'], 
-                    audio_filename
+        A single question goes out as one audio message carrying the question
+        and answer buttons as its caption. Several are sent as audio albums of
+        up to ten, which cannot carry buttons, followed by one message with a
+        numbered row of answer buttons per question.
+        
+        Args:
+            telegram_id: Telegram user ID
+            questions: Saved listening question rows with their audio bytes
+        """
+        if not questions:
+            return
+        
+        messages = [self._listening_message(question) for question in questions]
+        
+        if len(questions) == 1:
+            question, msg = questions[0], messages[0]
+            keyboard = self.formatter.create_answer_keyboard(question['id'])
+            fits_caption = len(msg) <= TELEGRAM_CAPTION_LIMIT
+            await self._send(
+                self.bot.send_audio,
+                chat_id=telegram_id,
+                audio=question['audio'],
+                filename="listening_1.mp3",
+                title="Listening Question 1",
+                **({'caption': msg, 'reply_markup': keyboard, 'parse_mode': 'Markdown'} if fits_caption else {})
+            )
+            if not fits_caption:
+                await self._send(
+                    self.bot.send_message,
+                    chat_id=telegram_id,
+                    text=msg,
+                    reply_markup=keyboard,
+                    parse_mode='Markdown'
                 )
-                
-                # Save to database
-                question = db_ops.save_question({
-                    'question_type': 'listening',
-                    'difficulty': difficulty,
-                    'question_text': q_data['question'],
-                    'option_a': q_data['option_a'],
-                    'option_b': q_data['option_b'],
-                    'option_c': q_data['option_c'],
-                    'option_d': q_data['option_d'],
-                    'correct_answer': q_data['correct_answer'],
-                    'explanation': q_data.get('explanation', ''),
-                    'audio_script': q_data['audio_script'],
-                    'audio_file_path': audio_path
-                })
-                
-                content['listening_questions'].append(question)
-                logger.info(f"Generated listening question {i+1} for user {user.telegram_id}")
-                
-            except Exception as e:
-                logger.error(f"Error generating listening question: {e}")
+            return
         
-        # Generate grammar/vocabulary questions
-        for i in range(config.grammar_questions_per_day):
-            try:
-                q_data = self.grammar_gen.generate_question(difficulty)
-                
-                # Save to database
-                question = db_ops.save_question({
-                    'question_type': q_data['question_type'],
-                    'difficulty': difficulty,
-                    'question_text': q_data['question_text'],
-                    'option_a': q_data['option_a'],
-                    'option_b': q_data['option_b'],
-                    'option_c': q_data['option_c'],
-                    'option_d': q_data['option_d'],
-                    'correct_answer': q_data['correct_answer'],
-                    'explanation': q_data.get('explanation', ''),
-                })
-                
-                content['grammar_questions'].append(question)
-                logger.info(f"Generated grammar question {i+1} for user {user.telegram_id}")
-                
-            except Exception as e:
-                logger.error(f"Error generating grammar question: {e}")
+        # Split into evenly sized albums so none falls below two items
+        groups = -(-len(questions) // TELEGRAM_MEDIA_GROUP_LIMIT)
+        bounds = [g * len(questions) // groups for g in range(groups + 1)]
+        
+        # Questions too long for a caption move to the answer message
+        overflow = []
+        for start, end in zip(bounds, bounds[1:]):
+            media = []
+            for i in range(start, end):
+                msg = messages[i]
+                fits_caption = len(msg) <= TELEGRAM_CAPTION_LIMIT
+                if not fits_caption:
+                    overflow.append(msg)
+                media.append(InputMediaAudio(
+                    media=questions[i]['audio'],
+                    filename=f"listening_{i + 1}.mp3",
+                    title=f"Listening Question {i + 1}",
+                    **({'caption': msg, 'parse_mode': 'Markdown'} if fits_caption else {})
+                ))
+            await self._send(self.bot.send_media_group, chat_id=telegram_id, media=media)
         
-        return content
+        await self._send(
+            self.bot.send_message,
+            chat_id=telegram_id,
+            text="\n\n".join([_LISTENING_ANSWER_PROMPT, *overflow]),
+            reply_markup=self.formatter.create_multi_answer_keyboard([q['id'] for q in questions]),
+            parse_mode='Markdown'
+        )
     
-    def send_daily_content(self, user, content: dict):
+    async def send_daily_content(self, telegram_id: int, content: dict) -> bool:
         """Send daily content to a user.
         
         Args:
-            user: User database object
+            telegram_id: Telegram user ID
             content: Dictionary with questions to send
+        
+        Returns:
+            True if every message was sent
         """
-        from formatters import TelegramFormatter
-        formatter = TelegramFormatter()
+        formatter = self.formatter
         
         try:
             # Get user stats for intro
-            session = get_session(self.engine)
-            db_ops = DatabaseOperations(session)
-            stats = db_ops.get_user_stats(user.telegram_id)
+            stats = await asyncio.to_thread(self._load_stats, telegram_id)
             
             # Send intro message
             intro_msg = formatter.format_daily_intro(stats)
-            self.bot.send_message(chat_id=user.telegram_id, text=intro_msg, parse_mode='Markdown')
+            await self._send(self.bot.send_message, chat_id=telegram_id, text=intro_msg, parse_mode='Markdown')
             
             # Send listening questions with audio
-            for i, question in enumerate(content['listening_questions'], 1):
-                # Send audio
-                with open(question.audio_file_path, 'rb') as audio_file:
-                    self.bot.send_audio(
-                        chat_id=user.telegram_id,
-                        audio=audio_file,
-                        title=f"Listening Question {i}"
-                    )
+            await self._send_listening(telegram_id, content['listening_questions'])
+            
+            # Send grammar questions; the separator and closing lines ride
+            # along on the first and last of them instead of extra messages
+            grammar_questions = content['grammar_questions']
+            closing_sent = False
+            for i, question in enumerate(grammar_questions, 1):
+                msg = formatter.format_grammar_question(question, question['id'], i)
+                if i == 1:
+                    msg = f"{_SEPARATOR}\n\n{msg}"
                 
-                # Send question with answer buttons
-                msg = formatter.format_listening_question({
-                    'question': question.question_text,
-                    'option_a': question.option_a,
-                    'option_b': question.option_b,
-                    'option_c': question.option_c,
-                    'option_d': question.option_d,
-                }, question.id)
+                if i == len(grammar_questions):
+                    with_closing = f"{msg.rstrip()}\n\n{_CLOSING_MESSAGE}"
+                    if len(with_closing) <= TELEGRAM_MESSAGE_LIMIT:
+                        msg, closing_sent = with_closing, True
                 
-                keyboard = formatter.create_answer_keyboard(question.id)
-                self.bot.send_message(
-                    chat_id=user.telegram_id,
+                keyboard = formatter.create_answer_keyboard(question['id'])
+                await self._send(
+                    self.bot.send_message,
+                    chat_id=telegram_id,
                     text=msg,
                     reply_markup=keyboard,
                     parse_mode='Markdown'
                 )
             
-            # Send grammar questions
-            self.bot.send_message(
-                chat_id=user.telegram_id,
-                text="\n━━━━━━━━━━━━━━━━━━━━━\n",
-                parse_mode='Markdown'
-            )
-            
-            for i, question in enumerate(content['grammar_questions'], 1):
-                msg = formatter.format_grammar_question({
-                    'question_type': question.question_type,
-                    'question_text': question.question_text,
-                    'option_a': question.option_a,
-                    'option_b': question.option_b,
-                    'option_c': question.option_c,
-                    'option_d': question.option_d,
-                }, question.id, i)
-                
-                keyboard = formatter.create_answer_keyboard(question.id)
-                self.bot.send_message(
-                    chat_id=user.telegram_id,
-                    text=msg,
-                    reply_markup=keyboard,
+            # Standalone closing message when it could not be attached
+            if not closing_sent:
+                await self._send(
+                    self.bot.send_message,
+                    chat_id=telegram_id,
+                    text=_CLOSING_MESSAGE,
                     parse_mode='Markdown'
                 )
             
-            # Closing message
-            self.bot.send_message(
-                chat_id=user.telegram_id,
-                text="━━━━━━━━━━━━━━━━━━━━━\n💡 Answer at your convenience. Good luck! 화이팅!",
-                parse_mode='Markdown'
-            )
-            
-            session.close()
-            logger.info(f"Daily content sent to user {user.telegram_id}")
+            logger.info("Daily content sent to user %s", telegram_id)
+            return True
             
-        except Exception as e:
-            logger.error(f"Error sending daily content to user {user.telegram_id}: {e}")
+        except Exception:
+            logger.exception("Error sending daily content to user %s", telegram_id)
+            return False
+    
+    def _count_active_users(self) -> Dict[str, int]:
+        """Count active users per difficulty level."""
+        with session_scope(self.engine) as session:
+            return DatabaseOperations(session).count_active_users_by_difficulty()
+    
+    async def prefetch_pool(self) -> int:
+        """Fill the question pool for the next delivery and synthesize its audio.
+        
+        Runs off-peak so the delivery itself mostly pops ready questions and
+        reads audio from the TTS cache. Each delivery bucket is filled to its
+        expected demand from that difficulty's active users, and never below
+        the configured depth; /practice buckets keep the configured depth.
+        
+        Returns:
+            Number of questions added to the pool
+        """
+        if self.pool_worker is None or self.question_cache is None:
+            return 0
+        
+        users = await asyncio.to_thread(self._count_active_users)
+        depths = {
+            (question_type, difficulty, None): max(
+                config.question_pool_depth, _expected_demand(count * getattr(config, setting), share)
+            )
+            for difficulty, count in users.items()
+            for question_type, (setting, share) in _DELIVERY_BUCKET_SHARES.items()
+        }
+        # Wait out an hourly refill still running instead of skipping the prefetch
+        added = await asyncio.to_thread(self.pool_worker.run_once, depths, True)
+        
+        # Synthesize audio for the listening questions the delivery will pop
+        scripts = []
+        for (question_type, difficulty, topic), depth in depths.items():
+            if question_type not in _LISTENING_POOL_TYPES:
+                continue
+            pooled = await asyncio.to_thread(
+                self.question_cache.peek_unused, question_type, difficulty, topic, depth
+            )
+            scripts.extend(q['audio_script'] for q in pooled if q.get('audio_script'))
+        
+        results = await asyncio.gather(
+            *(self.tts_gen.agenerate_audio(script) for script in scripts),
+            return_exceptions=True
+        )
+        failed = sum(isinstance(result, Exception) for result in results)
+        
+        logger.info(
+            "Pool prefetch added %d questions and prepared audio for %d/%d listening questions",
+            added, len(scripts) - failed, len(scripts)
+        )
+        return added
+    
+    def _load_pending_users(self, since: datetime) -> List[Tuple[int, str]]:
+        """Load (telegram_id, difficulty_level) for active users not yet delivered to since a time."""
+        with session_scope(self.engine) as session:
+            return [
+                (user.telegram_id, user.difficulty_level)
+                for user in DatabaseOperations(session).get_all_active_users(not_delivered_since=since)
+            ]
+    
+    def _mark_delivered(self, telegram_id: int):
+        """Record a completed delivery so a rerun today skips this user."""
+        with session_scope(self.engine) as session:
+            DatabaseOperations(session).mark_delivered(telegram_id)
+    
+    async def deliver_to_all_users(self):
+        """Generate and deliver content to all active users.
+        
+        Users are processed concurrently, at most ``config.max_parallel_users``
+        at a time; Bot API calls share one rate limiter. A run that starts
+        while another is in progress (e.g. the startup catch-up and the daily
+        job) is skipped, since both would load the same pending users.
+        """
+        if self._delivery_lock.locked():
+            logger.info("Daily delivery already running, skipping")
+            return
+        
+        async with self._delivery_lock:
+            await self._deliver_pending_users()
     
-    def deliver_to_all_users(self):
-        """Generate and deliver content to all active users."""
+    async def _deliver_pending_users(self):
+        """Deliver today's content to every active user not yet served today."""
+        now = datetime.now(ZoneInfo(config.timezone))
+        
         # Check if we should deliver today (skip weekends if configured)
         if not config.weekend_delivery:
-            if datetime.now().weekday() >= 5:  # Saturday = 5, Sunday = 6
+            if now.weekday() >= 5:  # Saturday = 5, Sunday = 6
                 logger.info("Skipping weekend delivery")
                 return
         
         logger.info("Starting daily content delivery")
         
-        session = get_session(self.engine)
-        db_ops = DatabaseOperations(session)
+        # Only users not yet served today, so a rerun after a crash resumes
+        # instead of sending the lesson twice
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        users = await asyncio.to_thread(
+            self._load_pending_users, today_start.astimezone(timezone.utc).replace(tzinfo=None)
+        )
+        logger.info("Delivering to %d active users", len(users))
         
-        try:
-            users = db_ops.get_all_active_users()
-            logger.info(f"Delivering to {len(users)} active users")
-            
-            for user in users:
+        semaphore = asyncio.Semaphore(config.max_parallel_users)
+        
+        async def deliver(telegram_id: int, difficulty: str):
+            async with semaphore:
                 try:
                     # Generate content
-                    content = self.generate_daily_content(user, db_ops)
+                    content = await self.generate_daily_content(telegram_id, difficulty)
                     
                     # Send to user
-                    self.send_daily_content(user, content)
+                    if await self.send_daily_content(telegram_id, content):
+                        await asyncio.to_thread(self._mark_delivered, telegram_id)
                     
-                    # Small delay between users
-                    time.sleep(1)
-                    
-                except Exception as e:
-                    logger.error(f"Error delivering to user {user.telegram_id}: {e}")
-                    continue
-            
-            logger.info("Daily content delivery complete")
-            
-        finally:
-            session.close()
+                except Exception:
+                    logger.exception("Error delivering to user %s", telegram_id)
+        
+        await asyncio.gather(*(deliver(telegram_id, difficulty) for telegram_id, difficulty in users))
+        
+        logger.info("Daily content delivery complete")
+    
+    async def _send(self, method, **kwargs):
+        """Call a Bot API method once the shared rate limiter allows it."""
+        await self.rate_limiter.acquire()
+        return await method(**kwargs)
     
     def start(self):
-        """Start the scheduler."""
+        """Start the scheduler on the running event loop."""
         # Schedule daily delivery
-        schedule.every().day.at(config.daily_delivery_time).do(self.deliver_to_all_users)
+        hour, minute = (int(part) for part in config.daily_delivery_time.split(':'))
+        self.scheduler.add_job(
+            self.deliver_to_all_users,
+            CronTrigger(hour=hour, minute=minute),
+            id='daily_delivery',
+            coalesce=True,
+            misfire_grace_time=DELIVERY_MISFIRE_GRACE_SECONDS
+        )
         
-        logger.info(f"Scheduler started. Daily delivery at {config.daily_delivery_time} {config.timezone}")
+        # The in-memory job store does not replay runs missed while the bot
+        # was down; if today's delivery time has passed, run a catch-up now.
+        # Users already served today are filtered out by last_delivery_at.
+        now = datetime.now(ZoneInfo(config.timezone))
+        if now >= now.replace(hour=hour, minute=minute, second=0, microsecond=0):
+            self.scheduler.add_job(
+                self.deliver_to_all_users,
+                id='daily_delivery_catch_up',
+                next_run_time=now
+            )
+        
+        # Keep the question pool topped up with batched requests
+        if self.pool_worker is not None:
+            self.scheduler.add_job(
+                self.pool_worker.run_once,
+                IntervalTrigger(minutes=POOL_REFILL_INTERVAL_MINUTES),
+                id='pool_refill',
+                coalesce=True
+            )
         
-        # Run scheduler loop
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        # Fill the pool for every active user off-peak, ahead of delivery
+        if self.pool_worker is not None and self.question_cache is not None:
+            prefetch_hour, prefetch_minute = (int(part) for part in config.pool_prefetch_time.split(':'))
+            self.scheduler.add_job(
+                self.prefetch_pool,
+                CronTrigger(hour=prefetch_hour, minute=prefetch_minute),
+                id='pool_prefetch',
+                coalesce=True,
+                misfire_grace_time=DELIVERY_MISFIRE_GRACE_SECONDS
+            )
+        
+        self.scheduler.start()
+        logger.info("Scheduler started. Daily delivery at %s %s", config.daily_delivery_time, config.timezone)
+    
+    def shutdown(self):
+        """Stop the scheduler without waiting for running jobs."""
+        if self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
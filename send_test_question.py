@@ -1,91 +1,84 @@
 """Send a test TOEIC question to Telegram."""
-import sys
+import atexit
 import os
-from pathlib import Path
 import asyncio
-from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
-from dotenv import load_dotenv
+from telegram import Bot
 import html
 
-# Add parent directory to path
-sys.path.insert(0, str(Path(__file__).parent))
-
 from generators.listening import ListeningGenerator
 from generators.grammar import GrammarGenerator
+from formatters import TelegramFormatter
+from config import config
+from database import init_db, session_scope, DatabaseOperations
 
-load_dotenv(Path(__file__).parent.parent / '.env')
+# Shared by both senders: one Bot (and HTTP connection pool), one engine and
+# one instance of each generator
+BOT = Bot(token=config.telegram_token)
+ENGINE = init_db(config.database_url)
+atexit.register(ENGINE.dispose)
+GRAMMAR_GEN = GrammarGenerator()
+LISTENING_GEN = ListeningGenerator()
 
 
-def escape_html(text):
-    """Escape HTML special characters."""
-    return html.escape(text)
+_esc = html.escape
 
+_GRAMMAR_MESSAGE_TEMPLATE = """📚 <b>TOEIC Grammar Question</b>
 
-async def send_grammar_question():
-    """Generate and send a grammar question."""
-    print("📝 Generating grammar question...")
-    generator = GrammarGenerator()
-    question = generator.generate_grammar_question(difficulty="intermediate")
-    
-    # Escape all text content
-    q_text = escape_html(question['question_text'])
-    opt_a = escape_html(question['option_a'])
-    opt_b = escape_html(question['option_b'])
-    opt_c = escape_html(question['option_c'])
-    opt_d = escape_html(question['option_d'])
-    grammar_pt = escape_html(question.get('grammar_point', 'N/A'))
-    
-    # Format message with proper HTML
-    message = f"""📚 <b>TOEIC Grammar Question</b>
+{question_text}
 
-{q_text}
-
-A) {opt_a}
-B) {opt_b}
-C) {opt_c}
-D) {opt_d}
+A) {option_a}
+B) {option_b}
+C) {option_c}
+D) {option_d}
 
 <i>Difficulty: Intermediate</i>
-<i>Grammar Point: {grammar_pt}</i>"""
-    
-    # Register user in database (for handling callbacks)
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN_TOEIC")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+<i>Grammar Point: {grammar_point}</i>"""
+
+_LISTENING_MESSAGE_TEMPLATE = """🎧 <b>TOEIC Listening Question</b>
+
+<b>Conversation:</b>
+{conversation}
+
+<b>Question:</b> {question}
+
+A) {option_a}
+B) {option_b}
+C) {option_c}
+D) {option_d}
+
+<i>Difficulty: Intermediate</i>"""
+
+
+def _escaped(question: dict) -> dict:
+    """HTML-escape every text field of a generated question."""
+    return {key: _esc(value) for key, value in question.items() if isinstance(value, str)}
+
 
-    from database import init_db, get_session, DatabaseOperations
-    from config import config
-    engine = init_db(config.database_url)
-    session = get_session(engine)
-    db_ops = DatabaseOperations(session)
+def _save_question(chat_id: str, question: dict, question_row: dict) -> int:
+    """Register the chat's user and store a question, returning its ID."""
+    with session_scope(ENGINE) as session:
+        db_ops = DatabaseOperations(session)
+        
+        # Register user in database (for handling callbacks)
+        db_ops.get_or_create_user(telegram_id=int(chat_id))
+        
+        # Save question to DB
+        return db_ops.insert_question({
+            'difficulty': 'intermediate',
+            **question_row,
+            'correct_answer': question['correct_answer'],
+            'explanation': question['explanation'],
+        })
+
+
+async def _save_and_send(bot: Bot, question: dict, message: str, question_row: dict):
+    """Store a question, then send it with answer buttons bound to its real ID."""
+    chat_id = os.getenv("TELEGRAM_CHAT_ID")
     
-    # Get or create user
-    user_obj = db_ops.get_or_create_user(telegram_id=int(chat_id))
+    question_id = await asyncio.to_thread(_save_question, chat_id, question, question_row)
     
-    # Save question to DB
-    question_obj = db_ops.save_question({
-        'question_type': 'grammar',
-        'difficulty': 'intermediate',
-        'question_text': question['question_text'],
-        'option_a': question['option_a'],
-        'option_b': question['option_b'],
-        'option_c': question['option_c'],
-        'option_d': question['option_d'],
-        'correct_answer': question['correct_answer'],
-        'explanation': question['explanation'],
-    })
-
     # Create buttons with REAL question ID
-    keyboard = [
-        [
-            InlineKeyboardButton("A", callback_data=f"answer_{question_obj.id}_A"),
-            InlineKeyboardButton("B", callback_data=f"answer_{question_obj.id}_B"),
-            InlineKeyboardButton("C", callback_data=f"answer_{question_obj.id}_C"),
-            InlineKeyboardButton("D", callback_data=f"answer_{question_obj.id}_D"),
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    bot = Bot(token=bot_token)
+    reply_markup = TelegramFormatter.create_answer_keyboard(question_id)
     
     print(f"📤 Sending to Telegram (Chat ID: {chat_id})...")
     await bot.send_message(
@@ -95,111 +88,61 @@ D) {opt_d}
         reply_markup=reply_markup
     )
     
-    session.close()
-    
     print("✅ Question sent successfully!")
     print(f"\n정답: {question['correct_answer']}")
     print(f"해설: {question['explanation']}")
 
 
-async def send_listening_question():
-    """Generate and send a listening question."""
-    print("\n🎧 Generating listening question...")
-    generator = ListeningGenerator()
-    question = generator.generate_conversation_question(difficulty="intermediate")
-    
-    # Format conversation with HTML escaping
-    conversation_parts = []
-    for exchange in question.get('conversation', []):
-        speaker = escape_html(exchange['speaker'])
-        text = escape_html(exchange['text'])
-        conversation_parts.append(f"<b>{speaker}:</b> {text}")
-    
-    conversation_text = "\n\n".join(conversation_parts)
+async def send_grammar_question(bot: Bot):
+    """Generate and send a grammar question."""
+    print("📝 Generating grammar question...")
+    question = GRAMMAR_GEN.generate_grammar_question(difficulty="intermediate")
     
-    # Escape question text and options
-    q_question = escape_html(question['question'])
-    opt_a = escape_html(question['option_a'])
-    opt_b = escape_html(question['option_b'])
-    opt_c = escape_html(question['option_c'])
-    opt_d = escape_html(question['option_d'])
+    message = _GRAMMAR_MESSAGE_TEMPLATE.format_map({'grammar_point': 'N/A', **_escaped(question)})
     
-    # Format message
-    message = f"""🎧 <b>TOEIC Listening Question</b>
-
-<b>Conversation:</b>
-{conversation_text}
-
-<b>Question:</b> {q_question}
+    await _save_and_send(bot, question, message, {
+        'question_type': 'grammar',
+        'question_text': question['question_text'],
+        'option_a': question['option_a'],
+        'option_b': question['option_b'],
+        'option_c': question['option_c'],
+        'option_d': question['option_d'],
+    })
 
-A) {opt_a}
-B) {opt_b}
-C) {opt_c}
-D) {opt_d}
 
-<i>Difficulty: Intermediate</i>"""
-    
-    # Register user and save question
-    bot_token = os.getenv("TELEGRAM_BOT_TOKEN_TOEIC")
-    chat_id = os.getenv("TELEGRAM_CHAT_ID")
+async def send_listening_question(bot: Bot):
+    """Generate and send a listening question."""
+    print("\n🎧 Generating listening question...")
+    question = LISTENING_GEN.generate_conversation_question(difficulty="intermediate")
     
-    from database import init_db, get_session, DatabaseOperations
-    from config import config
-    engine = init_db(config.database_url)
-    session = get_session(engine)
-    db_ops = DatabaseOperations(session)
+    conversation = "\n\n".join(
+        f"<b>{_esc(exchange['speaker'])}:</b> {_esc(exchange['text'])}"
+        for exchange in question.get('conversation', [])
+    )
+    message = _LISTENING_MESSAGE_TEMPLATE.format_map({**_escaped(question), 'conversation': conversation})
     
-    # Save question to DB
-    question_obj = db_ops.save_question({
+    await _save_and_send(bot, question, message, {
         'question_type': 'listening',
-        'difficulty': 'intermediate',
         'question_text': question['question'],
         'option_a': question['option_a'],
         'option_b': question['option_b'],
         'option_c': question['option_c'],
         'option_d': question['option_d'],
-        'correct_answer': question['correct_answer'],
-        'explanation': question['explanation'],
     })
 
-    # Create buttons with REAL question ID
-    keyboard = [
-        [
-            InlineKeyboardButton("A", callback_data=f"answer_{question_obj.id}_A"),
-            InlineKeyboardButton("B", callback_data=f"answer_{question_obj.id}_B"),
-            InlineKeyboardButton("C", callback_data=f"answer_{question_obj.id}_C"),
-            InlineKeyboardButton("D", callback_data=f"answer_{question_obj.id}_D"),
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    bot = Bot(token=bot_token)
-    
-    print(f"📤 Sending to Telegram (Chat ID: {chat_id})...")
-    await bot.send_message(
-        chat_id=chat_id,
-        text=message,
-        parse_mode='HTML',
-        reply_markup=reply_markup
-    )
-    
-    session.close()
-    
-    print("✅ Question sent successfully!")
-    print(f"\n정답: {question['correct_answer']}")
-    print(f"해설: {question['explanation']}")
-
 
 async def main():
     """Send both questions."""
     print("🚀 TOEIC Bot - Test Question Sender")
     print("=" * 60)
     
-    # Send grammar question
-    await send_grammar_question()
-    
-    # Send listening question
-    await send_listening_question()
+    # Initialize the HTTP client once and close it after both sends
+    async with BOT:
+        # Send grammar question
+        await send_grammar_question(BOT)
+        
+        # Send listening question
+        await send_listening_question(BOT)
     
     print("\n" + "=" * 60)
     print("🎉 All questions sent!")